@@ -1,3 +1,4 @@
+from functools import cached_property, lru_cache
 from typing import List
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -40,12 +41,12 @@ class Settings(BaseSettings):
         case_sensitive = False
         extra = "ignore"  # Ignore extra fields from consolidated .env
 
-    @property
+    @cached_property
     def allowed_countries_list(self) -> List[str]:
         """Parse allowed countries string to list"""
         return [c.strip().upper() for c in self.allowed_countries.split(",") if c.strip()]
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins string to list"""
         try:
@@ -54,6 +55,7 @@ class Settings(BaseSettings):
             return ["http://localhost:3000"]
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     return Settings()
 
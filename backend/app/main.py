@@ -1,12 +1,20 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
+import asyncio
 import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+import httpx
+import orjson
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timezone
 
 from .config import settings
 from .services.database import db_service
+from .services.http import riot_client
 from .routers import registration, leaderboard, auth
 from .routers.auth import discord
 
@@ -19,6 +27,14 @@ logging.basicConfig(
     level=logging.INFO if not settings.debug else logging.DEBUG,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
+
+# Hand log records to a background thread so handler I/O never blocks the event loop
+_log_queue: queue.Queue = queue.Queue(-1)
+_root_logger = logging.getLogger()
+_log_listener = QueueListener(_log_queue, *_root_logger.handlers, respect_handler_level=True)
+_root_logger.handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,6 +50,12 @@ async def lifespan(app: FastAPI):
         logger.info("Database connection established")
         await discord.init()
         logger.info("Discord OAuth client initialized")
+        app.state.httpx = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+        logger.info("Shared HTTP client initialized")
     except Exception as e:
         logger.error(f"Failed to initialize services: {e}")
         raise
@@ -42,8 +64,11 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down ValorantSL Backend API")
+    await app.state.httpx.aclose()
+    await riot_client.aclose()
     await db_service.disconnect()
     logger.info("Database connection closed")
+    _log_listener.stop()
 
 
 # Create FastAPI application
@@ -53,9 +78,13 @@ app = FastAPI(
     description="Backend API for ValorantSL - A Valorant leaderboard system",
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Compress larger responses (e.g. 200-entry leaderboard pages)
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -75,7 +104,7 @@ app.include_router(auth.router)
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc: HTTPException):
     """Handle HTTP exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": True,
@@ -88,8 +117,8 @@ async def http_exception_handler(request, exc: HTTPException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc: Exception):
     """Handle general exceptions"""
-    logger.error(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    logger.error("Unhandled exception", exc_info=exc)
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": True,
@@ -102,12 +131,12 @@ async def general_exception_handler(request, exc: Exception):
 # Discord exception handlers
 @app.exception_handler(Unauthorized)
 async def unauthorized_error_handler(request, exc):
-    return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    return ORJSONResponse({"error": "Unauthorized"}, status_code=401)
 
 
 @app.exception_handler(RateLimited)
 async def rate_limit_error_handler(request, exc: RateLimited):
-    return JSONResponse(
+    return ORJSONResponse(
         {"error": "RateLimited", "retry": exc.retry_after, "message": exc.message}, 
         status_code=429
     )
@@ -115,22 +144,54 @@ async def rate_limit_error_handler(request, exc: RateLimited):
 
 @app.exception_handler(ClientSessionNotInitialized)
 async def client_session_error_handler(request, exc: ClientSessionNotInitialized):
-    logger.error(f"Discord client session not initialized: {exc}")
-    return JSONResponse({"error": "Internal Error"}, status_code=500)
+    logger.error("Discord client session not initialized: %s", exc)
+    return ORJSONResponse({"error": "Internal Error"}, status_code=500)
+
+
+# Root endpoint - the body only depends on settings, so encode it once
+_ROOT_BYTES = orjson.dumps({
+    "message": "ValorantSL Backend API",
+    "version": settings.app_version,
+    "status": "running",
+    "docs_url": "/docs" if settings.debug else "disabled"
+})
 
 
-# Root endpoint
 @app.get("/")
 async def root():
     """
     Root endpoint - API health check
     """
-    return {
-        "message": "ValorantSL Backend API",
-        "version": settings.app_version,
-        "status": "running",
-        "docs_url": "/docs" if settings.debug else "disabled"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
+
+
+# Last database ping result, shared by concurrent health probes
+_HEALTH_PING_TTL = 5.0
+_last_ping = {"status": "healthy", "ts": 0.0}
+_ping_lock = asyncio.Lock()
+
+
+async def _get_db_status() -> str:
+    """Ping the database at most once per _HEALTH_PING_TTL seconds"""
+    if time.monotonic() - _last_ping["ts"] < _HEALTH_PING_TTL:
+        return _last_ping["status"]
+    
+    async with _ping_lock:
+        # Another probe may have refreshed the result while we waited
+        if time.monotonic() - _last_ping["ts"] < _HEALTH_PING_TTL:
+            return _last_ping["status"]
+        
+        try:
+            # Test database connection
+            await db_service.client.admin.command('ping')
+            db_status = "healthy"
+        except Exception as e:
+            logger.error(f"Database health check failed: {e}")
+            db_status = "unhealthy"
+        
+        _last_ping["status"] = db_status
+        _last_ping["ts"] = time.monotonic()
+        return db_status
 
 
 # Health check endpoint
@@ -139,51 +200,60 @@ async def health_check():
     """
     Health check endpoint
     """
-    try:
-        # Test database connection
-        await db_service.client.admin.command('ping')
-        db_status = "healthy"
-    except Exception as e:
-        logger.error(f"Database health check failed: {e}")
-        db_status = "unhealthy"
+    db_status = await _get_db_status()
     
     return {
         "status": "healthy" if db_status == "healthy" else "degraded",
         "database": db_status,
         "version": settings.app_version,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
+        "timestamp": datetime.now(timezone.utc)
     }
 
 
-# API info endpoint
+# API info endpoint - constant body, encoded once
+_INFO_BYTES = orjson.dumps({
+    "api_name": settings.app_name,
+    "version": settings.app_version,
+    "endpoints": {
+        "registration": "/api/v1/register",
+        "user_lookup": "/api/v1/user/{puuid}",
+        "user_refresh": "/api/v1/user/{puuid}/refresh",
+        "leaderboard": "/api/v1/leaderboard",
+        "leaderboard_stream": "/api/v1/leaderboard/stream",
+        "top_players": "/api/v1/leaderboard/top/{count}",
+        "search_user": "/api/v1/leaderboard/search/{discord_username}",
+        "leaderboard_stats": "/api/v1/leaderboard/stats"
+    },
+    "documentation": "/docs" if settings.debug else "disabled",
+    "status": "operational"
+})
+
+
 @app.get("/api/v1/info")
 async def api_info():
     """
     API information endpoint
     """
-    return {
-        "api_name": settings.app_name,
-        "version": settings.app_version,
-        "endpoints": {
-            "registration": "/api/v1/register",
-            "user_lookup": "/api/v1/user/{puuid}",
-            "user_refresh": "/api/v1/user/{puuid}/refresh",
-            "leaderboard": "/api/v1/leaderboard",
-            "top_players": "/api/v1/leaderboard/top/{count}",
-            "search_user": "/api/v1/leaderboard/search/{discord_username}",
-            "leaderboard_stats": "/api/v1/leaderboard/stats"
-        },
-        "documentation": "/docs" if settings.debug else "disabled",
-        "status": "operational"
-    }
+    return Response(content=_INFO_BYTES, media_type="application/json")
 
 
 if __name__ == "__main__":
+    # Recommended production command:
+    #   uvicorn app.main:app --workers 1 --loop uvloop --http httptools
+    # Keep a single worker: the OAuth code dedupe, preview/Riot response
+    # caches and leaderboard caches live in process memory, so extra workers
+    # would accept replayed OAuth codes and serve stale leaderboards after a
+    # registration. Scale out only once that state moves out of process.
     import uvicorn
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
         reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        workers=1,
+        limit_concurrency=1000,
+        timeout_keep_alive=30,
         log_level="info"
     )
\ No newline at end of file
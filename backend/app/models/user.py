@@ -1,5 +1,5 @@
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -12,6 +12,8 @@ class UserRegistration(BaseModel):
 
 class SeasonalRank(BaseModel):
     """Model for seasonal rank information"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     season_short: str = Field(..., description="Season short name (e.g., e10a2)")
     end_tier_name: str = Field(..., description="End tier name (e.g., Diamond 3)")
     wins: int = Field(..., description="Number of wins in this season")
@@ -21,13 +23,17 @@ class SeasonalRank(BaseModel):
 
 class PeakRank(BaseModel):
     """Model for peak rank information"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     season_short: str = Field(..., description="Season when peak was achieved")
     tier_name: str = Field(..., description="Peak rank tier name")
-    rr: int = Field(..., description="Rank rating at peak")
+    rr: Optional[int] = Field(None, description="Rank rating at peak, if known")
 
 
 class RankData(BaseModel):
     """Current rank details data"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     currenttier: int = Field(..., description="Current tier ID")
     currenttierpatched: str = Field(..., description="Current tier name")
     elo: int = Field(..., description="Current ELO rating")
@@ -57,7 +63,7 @@ class UserInDB(BaseModel):
     peak_rank: PeakRank = Field(..., description="Peak rank achieved")
     seasonal_extended_at: datetime = Field(..., description="Seasonal data last updated")
     seasonal_ranks: List[SeasonalRank] = Field(..., description="Historical seasonal ranks")
-    last_played_match: Optional[str] = Field(None, description="Last competitive match date (ISO format)")
+    last_played_match: Optional[datetime] = Field(None, description="Last competitive match date")
 
 
 class UserResponse(BaseModel):
@@ -71,11 +77,13 @@ class UserResponse(BaseModel):
     peak_rank: PeakRank
     seasonal_ranks: List[SeasonalRank]
     updated_at: datetime
-    last_played_match: Optional[str] = None
+    last_played_match: Optional[datetime] = None
 
 
 class LeaderboardEntry(BaseModel):
     """Model for leaderboard entries"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     puuid: str
     name: str
     tag: str
@@ -85,16 +93,23 @@ class LeaderboardEntry(BaseModel):
     rank_in_tier: Optional[int] = None
     peak_rank: Optional[str] = None
     peak_season: Optional[str] = None
-    last_played_match: Optional[str] = None
+    last_played_match: Optional[datetime] = None
+
+
+class LeaderboardCursor(BaseModel):
+    """Keyset cursor pointing just past the last entry of a leaderboard page"""
+    after_elo: int
+    after_puuid: str
 
 
 class LeaderboardResponse(BaseModel):
     """Response model for leaderboard with pagination"""
     entries: List[LeaderboardEntry]
     total: int
-    page: int
+    page: Optional[int] = None
     per_page: int
     total_pages: int
+    next_cursor: Optional[LeaderboardCursor] = None
 
 
 class RegistrationResponse(BaseModel):
@@ -1,23 +1,29 @@
 """Discord OAuth authentication router"""
-from typing import Optional, Dict, Any, Set
-from fastapi import APIRouter, HTTPException, Query, Depends, Body
-from fastapi.responses import JSONResponse
-from fastapi_discord import DiscordOAuthClient, User, Unauthorized, RateLimited
-from fastapi_discord.exceptions import ClientSessionNotInitialized
+from fastapi import APIRouter, HTTPException, Query, Body, Request
+from fastapi_discord import DiscordOAuthClient
 import logging
-import httpx
-from datetime import datetime
+from cachetools import TTLCache
 
 from ..config import settings
 from ..services.database import db_service
-from ..models.user import UserInDB
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/auth", tags=["authentication"])
 
-# Cache to store used OAuth codes to prevent duplicate exchanges
-_used_codes: Set[str] = set()
+# Cache to store used OAuth codes to prevent duplicate exchanges.
+# Discord codes expire after ~10 minutes, so entries can be dropped after that.
+_used_codes: TTLCache = TTLCache(maxsize=10_000, ttl=600)
+
+# Fields read by the existence checks below
+_USER_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "puuid": 1,
+    "name": 1,
+    "tag": 1,
+    "discord_username": 1,
+    "rank_details.data.currenttierpatched": 1
+}
 
 # Initialize Discord OAuth client
 discord = DiscordOAuthClient(
@@ -35,7 +41,7 @@ async def discord_login():
 
 
 @router.get("/discord/callback")
-async def discord_callback(code: str = Query(...)):
+async def discord_callback(request: Request, code: str = Query(...)):
     """Handle Discord OAuth callback and exchange code for user info"""
     
     # Check if this code has already been used to prevent duplicate processing
@@ -44,20 +50,19 @@ async def discord_callback(code: str = Query(...)):
     
     try:
         # Mark code as being used
-        _used_codes.add(code)
+        _used_codes[code] = True
         
         # Exchange code for access token
         token, refresh_token = await discord.get_access_token(code)
         
-        # Get user info from Discord
-        async with httpx.AsyncClient() as client:
-            headers = {"Authorization": f"Bearer {token}"}
-            response = await client.get("https://discord.com/api/users/@me", headers=headers)
-            
-            if response.status_code != 200:
-                raise HTTPException(status_code=400, detail="Failed to get Discord user info")
-            
-            discord_user = response.json()
+        # Get user info from Discord using the shared app-lifetime client
+        headers = {"Authorization": f"Bearer {token}"}
+        response = await request.app.state.httpx.get("https://discord.com/api/users/@me", headers=headers)
+        
+        if response.status_code != 200:
+            raise HTTPException(status_code=400, detail="Failed to get Discord user info")
+        
+        discord_user = response.json()
         
         # Extract user data
         user_data = {
@@ -71,23 +76,30 @@ async def discord_callback(code: str = Query(...)):
         
         logger.info(f"Discord user authenticated: {user_data['discord_username']} (ID: {user_data['discord_id']})")
         
-        # Check if user already exists in database
-        existing_user = await db_service.get_user_by_discord_id(user_data["discord_id"])
+        # Check if user already exists in database. Discord access tokens are
+        # opaque (no embedded user id), so this lookup cannot be started before
+        # /users/@me returns and there is nothing left to overlap it with.
+        # Only the summary fields are read, so the seasonal_ranks history is
+        # never transferred.
+        existing_user = await db_service.get_user_doc_by_discord_id(
+            user_data["discord_id"],
+            projection=_USER_SUMMARY_PROJECTION
+        )
         
         return {
             "user": user_data,
             "exists": existing_user is not None,
             "existing_data": {
-                "puuid": existing_user.puuid,
-                "name": existing_user.name,
-                "tag": existing_user.tag,
-                "current_rank": existing_user.rank_details.data.currenttierpatched if existing_user and existing_user.rank_details else None
+                "puuid": existing_user.get("puuid"),
+                "name": existing_user.get("name"),
+                "tag": existing_user.get("tag"),
+                "current_rank": (existing_user.get("rank_details") or {}).get("data", {}).get("currenttierpatched")
             } if existing_user else None
         }
         
     except Exception as e:
         # Remove from used codes on error so it can be retried if needed
-        _used_codes.discard(code)
+        _used_codes.pop(code, None)
         logger.error(f"Discord OAuth callback error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -96,17 +108,18 @@ async def discord_callback(code: str = Query(...)):
 async def check_discord_exists(discord_id: int = Body(..., embed=True)):
     """Check if a Discord user already exists in the database"""
     try:
-        user = await db_service.get_user_by_discord_id(discord_id)
+        # Only a few fields are returned, so skip full UserInDB validation
+        user = await db_service.get_user_doc_by_discord_id(discord_id, projection=_USER_SUMMARY_PROJECTION)
         
         if user:
             return {
                 "exists": True,
                 "user": {
-                    "puuid": user.puuid,
-                    "name": user.name,
-                    "tag": user.tag,
-                    "discord_username": user.discord_username,
-                    "current_rank": user.rank_details.data.currenttierpatched if user.rank_details else None
+                    "puuid": user.get("puuid"),
+                    "name": user.get("name"),
+                    "tag": user.get("tag"),
+                    "discord_username": user.get("discord_username"),
+                    "current_rank": (user.get("rank_details") or {}).get("data", {}).get("currenttierpatched")
                 }
             }
         
@@ -127,18 +140,21 @@ async def check_puuid_exists(puuid: str = Body(..., embed=True)):
             logger.error("Empty PUUID received")
             raise HTTPException(status_code=400, detail="PUUID is required")
         
-        exists = await db_service.user_exists(puuid)
+        # One lookup answers both "does it exist" and "who owns it"
+        user = await db_service.get_user_doc_by_puuid(
+            puuid,
+            projection={"_id": 0, "name": 1, "tag": 1, "discord_username": 1}
+        )
         
-        if exists:
-            user = await db_service.get_user_by_puuid(puuid)
-            logger.info(f"PUUID {puuid} already exists for user {user.name}#{user.tag}" if user else f"PUUID {puuid} exists but user data not found")
+        if user is not None:
+            logger.info(f"PUUID {puuid} already exists for user {user.get('name')}#{user.get('tag')}")
             return {
                 "exists": True,
                 "user": {
-                    "name": user.name,
-                    "tag": user.tag,
-                    "discord_username": user.discord_username
-                } if user else None
+                    "name": user.get("name"),
+                    "tag": user.get("tag"),
+                    "discord_username": user.get("discord_username")
+                }
             }
         
         logger.info(f"PUUID {puuid} does not exist in database")
@@ -1,20 +1,81 @@
 from fastapi import APIRouter, HTTPException, Query, Path
-from typing import Optional, List
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import AsyncIterator, Optional, List
 import logging
-import math
+import orjson
 
 from ..models.user import LeaderboardResponse, LeaderboardEntry
-from ..services.database import db_service
+from ..services.database import db_service, DISCORD_USERNAME_COLLATION
+from ..services.cache import stats_cache, top_players_cache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["leaderboard"])
 
+# Static projection for the username search pipeline
+_SEARCH_PROJECT_STAGE = {
+    "$project": {
+        "_id": 0,
+        "puuid": 1,
+        "name": 1,
+        "tag": 1,
+        "discord_username": 1,
+        "current_tier": "$rank_details.data.currenttierpatched",
+        "elo": "$rank_details.data.elo",
+        "rank_in_tier": "$rank_details.data.ranking_in_tier",
+        "peak_rank": "$peak_rank.tier_name",
+        "peak_season": "$peak_rank.season_short"
+    }
+}
 
-@router.get("/leaderboard", response_model=LeaderboardResponse)
+# Single aggregation computing both the ELO statistics and the rank
+# distribution, so the collection is scanned once per request
+_STATS_PIPELINE = [
+    {
+        "$facet": {
+            "stats": [
+                {
+                    "$match": {"rank_details.data.elo": {"$ne": None}}
+                },
+                {
+                    "$group": {
+                        "_id": None,
+                        "total_users": {"$sum": 1},
+                        "highest_elo": {"$max": "$rank_details.data.elo"},
+                        "lowest_elo": {"$min": "$rank_details.data.elo"},
+                        "average_elo": {"$avg": "$rank_details.data.elo"}
+                    }
+                }
+            ],
+            "rank_distribution": [
+                {
+                    "$match": {"rank_details.data.currenttierpatched": {"$ne": None}}
+                },
+                {
+                    "$group": {
+                        "_id": "$rank_details.data.currenttierpatched",
+                        "count": {"$sum": 1}
+                    }
+                },
+                {
+                    "$sort": {"count": -1}
+                }
+            ]
+        }
+    }
+]
+
+
+@router.get(
+    "/leaderboard",
+    response_model=None,
+    responses={200: {"model": LeaderboardResponse}}
+)
 async def get_leaderboard(
     page: int = Query(1, ge=1, description="Page number (1-based)"),
-    per_page: int = Query(50, ge=1, le=200, description="Number of entries per page (1-200)")
+    per_page: int = Query(50, ge=1, le=200, description="Number of entries per page (1-200)"),
+    after_elo: Optional[int] = Query(None, description="Keyset cursor: ELO of the last entry already seen"),
+    after_puuid: Optional[str] = Query(None, description="Keyset cursor: PUUID of the last entry already seen")
 ):
     """
     Get the leaderboard with pagination.
@@ -24,40 +85,57 @@ async def get_leaderboard(
     Parameters:
     - page: Page number (starts from 1)
     - per_page: Number of entries per page (max 200)
+    - after_elo / after_puuid: Optional cursor from a previous response's
+      next_cursor. When given, the page starts right after that entry
+      instead of skipping (page - 1) * per_page rows, which keeps deep
+      pages cheap, and page is ignored. Prefer this over large page numbers.
     
     Returns:
     - entries: List of leaderboard entries
     - total: Total number of users in leaderboard
-    - page: Current page number
+    - page: Current page number, null for cursor requests
     - per_page: Entries per page
     - total_pages: Total number of pages
+    - next_cursor: Cursor for the following page, null on the last page
     """
+    if (after_elo is None) != (after_puuid is None):
+        raise HTTPException(status_code=400, detail="after_elo and after_puuid must be provided together")
+    
+    # A cursor addresses the page on its own; page numbers do not apply
+    if after_elo is not None:
+        page = None
+    
     try:
         logger.info(f"Fetching leaderboard page {page} with {per_page} entries per page")
         
-        # Get leaderboard data from database
-        entries, total = await db_service.get_leaderboard(page=page, per_page=per_page)
+        # Raw projected documents go straight to orjson; no per-entry models
+        entries, total, next_cursor = await db_service.get_leaderboard_documents(
+            page=page or 1,
+            per_page=per_page,
+            after_elo=after_elo,
+            after_puuid=after_puuid
+        )
         
         # Calculate total pages
-        total_pages = math.ceil(total / per_page) if total > 0 else 1
+        total_pages = max(1, -(-total // per_page))
         
         # Validate page number
-        if page > total_pages:
+        if page is not None and page > total_pages:
             raise HTTPException(
                 status_code=404,
                 detail=f"Page {page} not found. Total pages: {total_pages}"
             )
         
-        response = LeaderboardResponse(
-            entries=entries,
-            total=total,
-            page=page,
-            per_page=per_page,
-            total_pages=total_pages
-        )
-        
         logger.info(f"Successfully fetched leaderboard: {len(entries)} entries, page {page}/{total_pages}")
-        return response
+        # Same shape as LeaderboardResponse, serialized directly by orjson
+        return ORJSONResponse(content={
+            "entries": entries,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": total_pages,
+            "next_cursor": next_cursor
+        })
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -67,7 +145,55 @@ async def get_leaderboard(
         raise HTTPException(status_code=500, detail="Internal server error while fetching leaderboard")
 
 
-@router.get("/leaderboard/top/{count}", response_model=List[LeaderboardEntry])
+@router.get(
+    "/leaderboard/stream",
+    response_model=None,
+    responses={200: {"model": LeaderboardResponse}}
+)
+async def stream_leaderboard(
+    page: int = Query(1, ge=1, description="Page number (1-based)"),
+    per_page: int = Query(50, ge=1, le=200, description="Number of entries per page (1-200)")
+):
+    """
+    Streaming variant of /leaderboard with the same response shape.
+    
+    Entries are encoded straight from the database cursor as they arrive,
+    without building the whole page in memory first.
+    """
+    try:
+        total = await db_service.count_leaderboard()
+    except Exception as e:
+        logger.error(f"Error counting leaderboard entries: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error while fetching leaderboard")
+    
+    total_pages = max(1, -(-total // per_page))
+    if page > total_pages:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Page {page} not found. Total pages: {total_pages}"
+        )
+    
+    async def body() -> AsyncIterator[bytes]:
+        yield b'{"entries":['
+        separator = b""
+        async for entry in db_service.iter_leaderboard(page=page, per_page=per_page):
+            yield separator + orjson.dumps(entry)
+            separator = b","
+        yield b'],' + orjson.dumps({
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": total_pages
+        })[1:]
+    
+    return StreamingResponse(body(), media_type="application/json")
+
+
+@router.get(
+    "/leaderboard/top/{count}",
+    response_model=None,
+    responses={200: {"model": List[LeaderboardEntry]}}
+)
 async def get_top_players(
     count: int = Path(..., ge=1, le=100, description="Number of top players to retrieve (1-100)")
 ):
@@ -80,21 +206,31 @@ async def get_top_players(
     Returns:
     - List of top leaderboard entries sorted by ELO
     """
+    cached = top_players_cache.get(count)
+    if cached is not None:
+        return ORJSONResponse(content=cached)
+    
     try:
         logger.info(f"Fetching top {count} players")
         
-        # Get top players (always page 1 with count as per_page)
-        entries, _ = await db_service.get_leaderboard(page=1, per_page=count)
+        # Get top players (always page 1 with count as per_page); raw projected
+        # documents, serialized by orjson exactly like /leaderboard entries
+        entries, _, _ = await db_service.get_leaderboard_documents(page=1, per_page=count)
+        top_players_cache[count] = entries
         
         logger.info(f"Successfully fetched top {len(entries)} players")
-        return entries
+        return ORJSONResponse(content=entries)
         
     except Exception as e:
         logger.error(f"Error fetching top {count} players: {e}")
         raise HTTPException(status_code=500, detail="Internal server error while fetching top players")
 
 
-@router.get("/leaderboard/search/{discord_username}", response_model=Optional[LeaderboardEntry])
+@router.get(
+    "/leaderboard/search/{discord_username}",
+    response_model=None,
+    responses={200: {"model": Optional[LeaderboardEntry]}}
+)
 async def find_user_in_leaderboard(discord_username: str):
     """
     Find a specific user in the leaderboard by Discord username.
@@ -108,37 +244,25 @@ async def find_user_in_leaderboard(discord_username: str):
     try:
         logger.info(f"Searching for user: {discord_username}")
         
-        # Use aggregation pipeline to find specific user
+        # Use aggregation pipeline to find specific user; stop at the first match
         pipeline = [
-            {
-                "$match": {"discord_username": {"$regex": f"^{discord_username}$", "$options": "i"}}
-            },
-            {
-                "$project": {
-                    "puuid": 1,
-                    "name": 1,
-                    "tag": 1,
-                    "discord_username": 1,
-                    "current_tier": "$rank_details.data.currenttierpatched",
-                    "elo": "$rank_details.data.elo",
-                    "rank_in_tier": "$rank_details.data.ranking_in_tier",
-                    "peak_rank": "$peak_rank.tier_name",
-                    "peak_season": "$peak_rank.season_short"
-                }
-            }
+            {"$match": {"discord_username": discord_username}},
+            {"$limit": 1},
+            _SEARCH_PROJECT_STAGE
         ]
         
-        cursor = db_service.collection.aggregate(pipeline)
+        # Case-insensitive exact match served by the collated discord_username index
+        cursor = db_service.collection.aggregate(pipeline, collation=DISCORD_USERNAME_COLLATION)
         users = await cursor.to_list(length=1)
         
         if users:
             user_data = users[0]
-            entry = LeaderboardEntry(**user_data)
-            logger.info(f"Found user {discord_username}: {entry.name}#{entry.tag}")
-            return entry
+            # Trusted, fixed $project output, serialized directly by orjson
+            logger.info(f"Found user {discord_username}: {user_data.get('name')}#{user_data.get('tag')}")
+            return ORJSONResponse(content=user_data)
         
         logger.info(f"User {discord_username} not found in leaderboard")
-        return None
+        return ORJSONResponse(content=None)
         
     except Exception as e:
         logger.error(f"Error searching for user {discord_username}: {e}")
@@ -156,98 +280,44 @@ async def get_leaderboard_stats():
     - average_elo: Average ELO of all users
     - rank_distribution: Distribution of users by rank tiers
     """
+    cached = stats_cache.get("stats")
+    if cached is not None:
+        return cached
+    
     try:
         logger.info("Fetching leaderboard statistics")
         
-        # Aggregation pipeline for statistics
-        pipeline = [
-            {
-                "$match": {
-                    "$or": [
-                        {"rank_details.data.elo": {"$exists": True, "$ne": None}},
-                        {"rank_details.elo": {"$exists": True, "$ne": None}}
-                    ]
-                }
-            },
-            {
-                "$project": {
-                    "elo": {
-                        "$ifNull": ["$rank_details.data.elo", "$rank_details.elo"]
-                    }
-                }
-            },
-            {
-                "$group": {
-                    "_id": None,
-                    "total_users": {"$sum": 1},
-                    "highest_elo": {"$max": "$elo"},
-                    "lowest_elo": {"$min": "$elo"},
-                    "average_elo": {"$avg": "$elo"}
-                }
-            }
-        ]
-        
-        cursor = db_service.collection.aggregate(pipeline)
-        stats_result = await cursor.to_list(length=1)
+        cursor = db_service.collection.aggregate(_STATS_PIPELINE)
+        result = await cursor.to_list(length=1)
+        facets = result[0] if result else {"stats": [], "rank_distribution": []}
         
-        if not stats_result:
-            return {
+        if not facets["stats"]:
+            response = {
                 "total_users": 0,
                 "highest_elo": 0,
                 "lowest_elo": 0,
                 "average_elo": 0,
                 "rank_distribution": {}
             }
-        
-        stats = stats_result[0]
-        
-        # Get rank distribution
-        rank_pipeline = [
-            {
-                "$match": {
-                    "$or": [
-                        {"rank_details.data.currenttierpatched": {"$exists": True, "$ne": None}},
-                        {"rank_details.currenttierpatched": {"$exists": True, "$ne": None}}
-                    ]
-                }
-            },
-            {
-                "$project": {
-                    "tier": {
-                        "$ifNull": ["$rank_details.data.currenttierpatched", "$rank_details.currenttierpatched"]
-                    }
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$tier",
-                    "count": {"$sum": 1}
-                }
-            },
-            {
-                "$sort": {"count": -1}
+        else:
+            stats = facets["stats"][0]
+            rank_distribution = {
+                item["_id"]: item["count"] 
+                for item in facets["rank_distribution"]
+            }
+            
+            response = {
+                "total_users": stats["total_users"],
+                "highest_elo": stats["highest_elo"],
+                "lowest_elo": stats["lowest_elo"],
+                "average_elo": round(stats["average_elo"], 2),
+                "rank_distribution": rank_distribution
             }
-        ]
-        
-        cursor = db_service.collection.aggregate(rank_pipeline)
-        rank_distribution_result = await cursor.to_list(length=None)
-        
-        rank_distribution = {
-            item["_id"]: item["count"] 
-            for item in rank_distribution_result
-        }
-        
-        response = {
-            "total_users": stats["total_users"],
-            "highest_elo": stats["highest_elo"],
-            "lowest_elo": stats["lowest_elo"],
-            "average_elo": round(stats["average_elo"], 2),
-            "rank_distribution": rank_distribution
-        }
         
+        stats_cache["stats"] = response
         logger.info("Successfully fetched leaderboard statistics")
         return response
         
     except Exception as e:
         logger.error(f"Error fetching leaderboard statistics: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error while fetching statistics")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error while fetching statistics")
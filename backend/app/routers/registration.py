@@ -1,13 +1,19 @@
 """User registration router with Riot API integration"""
 from typing import Optional, Dict, Any
 from fastapi import APIRouter, HTTPException, Body, Depends
+from fastapi.responses import Response
 from pydantic import BaseModel
+import asyncio
 import httpx
 import logging
-from datetime import datetime
+import orjson
+import time
+from datetime import datetime, timezone
 
 from ..config import settings
 from ..services.database import db_service
+from ..services.cache import clear_leaderboard_caches, preview_cache, riot_response_cache
+from ..services.http import riot_client, coalesce
 from ..models.user import UserInDB
 from ..dependencies.geo import require_allowed_country
 
@@ -15,6 +21,10 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/register", tags=["registration"])
 
+# How long cached Riot responses are reused before asking Riot again
+_MMR_FRESH_SECONDS = 90
+_MATCHES_FRESH_SECONDS = 60
+
 
 class RegistrationRequest(BaseModel):
     """Registration request model"""
@@ -36,52 +46,76 @@ class PlayerPreview(BaseModel):
 
 
 async def fetch_riot_api(endpoint: str) -> Optional[Dict[str, Any]]:
-    """Helper function to make Riot API requests"""
-    url = f"{settings.riot_api_base_url}{endpoint}"
-    headers = {"Authorization": settings.riot_api_key} if settings.riot_api_key else {}
+    """Helper function to make Riot API requests
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(url, headers=headers)
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 404:
-                return None
-            else:
-                logger.error(f"Riot API error {response.status_code}: {response.text}")
-                return None
-        except Exception as e:
-            logger.error(f"Riot API request failed: {e}")
+    Concurrent requests for the same endpoint share a single upstream call.
+    """
+    return await coalesce(endpoint, lambda: _fetch_riot_api(endpoint))
+
+
+async def _fetch_riot_api(endpoint: str) -> Optional[Dict[str, Any]]:
+    """Issue one Riot API GET, returning None on 404 or any failure"""
+    try:
+        response = await riot_client.get(endpoint)
+        if response.status_code == 404:
             return None
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    except httpx.HTTPStatusError as e:
+        logger.error("Riot API error %s: %s", e.response.status_code, e.response.text)
+        return None
+    except Exception as e:
+        logger.error("Riot API request failed: %s", e)
+        return None
+
+
+async def fetch_riot_api_cached(endpoint: str, fresh_for: float) -> Optional[Dict[str, Any]]:
+    """fetch_riot_api with a short-lived response cache
+    
+    A cached response younger than fresh_for seconds is returned without a
+    request. If a refresh fails, the last known response is served instead.
+    """
+    entry = riot_response_cache.get(endpoint)
+    if entry is not None and time.monotonic() - entry[0] < fresh_for:
+        return entry[1]
+    
+    data = await fetch_riot_api(endpoint)
+    if data is not None:
+        riot_response_cache[endpoint] = (time.monotonic(), data)
+        return data
+    
+    if entry is not None:
+        logger.warning("Riot API unavailable for %s, serving cached response", endpoint)
+        return entry[1]
+    return None
 
 
 async def get_player_mmr(puuid: str) -> Optional[Dict[str, Any]]:
-    """Get player MMR/rank information - same as updater"""
+    """Get player MMR/rank information - same as updater
+    
+    Cached briefly so the submit that follows a preview reuses its data.
+    """
     endpoint = f"/valorant/v3/by-puuid/mmr/ap/pc/{puuid}"
-    return await fetch_riot_api(endpoint)
+    return await fetch_riot_api_cached(endpoint, fresh_for=_MMR_FRESH_SECONDS)
 
 
 async def get_last_played_match(puuid: str) -> Optional[str]:
     """Get the date of the last competitive match - same as updater"""
     endpoint = f"/valorant/v4/by-puuid/matches/{settings.riot_region}/{settings.riot_platform}/{puuid}?mode=competitive&size=1"
-    response = await fetch_riot_api(endpoint)
+    response = await fetch_riot_api_cached(endpoint, fresh_for=_MATCHES_FRESH_SECONDS)
+    if not response:
+        return None
     
-    if response and "data" in response:
-        matches = response["data"]
-        if matches and len(matches) > 0:
-            last_match = matches[0]
-            
-            # Check for started_at in metadata (v4 API)
-            if "metadata" in last_match and "started_at" in last_match["metadata"]:
-                return last_match["metadata"]["started_at"]
-            
-            # Fallback to game_start timestamp
-            if "metadata" in last_match and "game_start" in last_match["metadata"]:
-                timestamp_ms = last_match["metadata"]["game_start"]
-                timestamp_seconds = timestamp_ms / 1000
-                return datetime.fromtimestamp(timestamp_seconds).isoformat()
+    meta = (response.get("data") or [{}])[0].get("metadata") or {}
     
-    return None
+    # Prefer started_at in metadata (v4 API), already an ISO string
+    started_at = meta.get("started_at")
+    if started_at:
+        return started_at
+    
+    # Fallback to the game_start epoch-millisecond timestamp
+    game_start = meta.get("game_start")
+    return None if game_start is None else datetime.fromtimestamp(game_start / 1000, tz=timezone.utc).isoformat()
 
 
 def process_mmr_data(mmr_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -142,14 +176,22 @@ def get_peak_rank_info(mmr_data: Dict[str, Any]) -> Dict[str, Any]:
 async def preview_player(puuid: str = Body(..., embed=True)):
     """Get player preview data before registration"""
     try:
-        logger.info(f"Fetching preview for PUUID: {puuid}")
-        
-        # Check if PUUID already exists
+        # Check if PUUID already exists; done before the cache so a player
+        # registered since the preview was cached is not offered again
         if await db_service.user_exists(puuid):
             raise HTTPException(status_code=409, detail="Player already registered")
         
-        # Fetch MMR data (includes account info)
-        mmr_data = await get_player_mmr(puuid)
+        cached = preview_cache.get(puuid)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+        
+        logger.info("Fetching preview for PUUID: %s", puuid)
+        
+        # Fetch MMR data (includes account info) and last played match concurrently
+        mmr_data, last_played = await asyncio.gather(
+            get_player_mmr(puuid),
+            get_last_played_match(puuid)
+        )
         if not mmr_data or "data" not in mmr_data:
             raise HTTPException(status_code=404, detail="Player not found or has no competitive data")
         
@@ -160,9 +202,6 @@ async def preview_player(puuid: str = Body(..., embed=True)):
         if not account_info.get("name"):
             raise HTTPException(status_code=404, detail="Player account information not found")
         
-        # Get last played match
-        last_played = await get_last_played_match(puuid)
-        
         # Process rank data
         rank_details = process_mmr_data(mmr_data)
         peak_rank = get_peak_rank_info(mmr_data)
@@ -179,13 +218,16 @@ async def preview_player(puuid: str = Body(..., embed=True)):
             last_played=last_played
         )
         
-        logger.info(f"Preview fetched for {preview.name}#{preview.tag}")
-        return preview
+        body = preview.model_dump_json().encode()
+        preview_cache[puuid] = body
+        
+        logger.info("Preview fetched for %s#%s", preview.name, preview.tag)
+        return Response(content=body, media_type="application/json")
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching player preview: {e}")
+        logger.error("Error fetching player preview: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch player data")
 
 
@@ -193,19 +235,19 @@ async def preview_player(puuid: str = Body(..., embed=True)):
 async def submit_registration(request: RegistrationRequest):
     """Submit final registration to add player to leaderboard"""
     try:
-        logger.info(f"Processing registration for Discord user {request.discord_username} with PUUID {request.puuid}")
+        logger.info("Processing registration for Discord user %s with PUUID %s", request.discord_username, request.puuid)
         
-        # Check if Discord user already exists
-        existing_discord = await db_service.get_user_by_discord_id(request.discord_id)
-        if existing_discord:
+        # Uniqueness is enforced by the insert itself (unique puuid and
+        # discord_id indexes); only pre-check when the discord_id index is missing
+        if not db_service.discord_id_unique and await db_service.discord_exists(request.discord_id):
             raise HTTPException(status_code=409, detail="Discord user already registered")
         
-        # Check if PUUID already exists
-        if await db_service.user_exists(request.puuid):
-            raise HTTPException(status_code=409, detail="PUUID already registered")
-        
-        # Fetch complete player data using same logic as updater
-        mmr_data = await get_player_mmr(request.puuid)
+        # Fetch complete player data using same logic as updater; the MMR and
+        # match history requests are independent, so run them concurrently
+        mmr_data, last_played = await asyncio.gather(
+            get_player_mmr(request.puuid),
+            get_last_played_match(request.puuid)
+        )
         if not mmr_data or "data" not in mmr_data:
             raise HTTPException(status_code=404, detail="Player not found")
         
@@ -213,9 +255,6 @@ async def submit_registration(request: RegistrationRequest):
         mmr_response = mmr_data["data"]
         account_info = mmr_response.get("account", {})
         
-        # Get last played match
-        last_played = await get_last_played_match(request.puuid)
-        
         # Process all data
         rank_details = process_mmr_data(mmr_data)
         peak_rank = get_peak_rank_info(mmr_data)
@@ -239,18 +278,24 @@ async def submit_registration(request: RegistrationRequest):
             last_played_match=last_played
         )
         
-        # Save to database
-        created_user = await db_service.create_user(user_data)
+        # Save to database; the insert enforces uniqueness
+        conflict = await db_service.register_if_absent(user_data)
+        if conflict == "discord_id":
+            raise HTTPException(status_code=409, detail="Discord user already registered")
+        if conflict == "puuid":
+            raise HTTPException(status_code=409, detail="PUUID already registered")
+        clear_leaderboard_caches()
+        preview_cache.pop(request.puuid, None)
         
-        logger.info(f"Successfully registered {created_user.name}#{created_user.tag} for Discord user {request.discord_username}")
+        logger.info("Successfully registered %s#%s for Discord user %s", user_data.name, user_data.tag, request.discord_username)
         
         return {
             "success": True,
             "message": "Registration successful",
             "player": {
-                "puuid": created_user.puuid,
-                "name": created_user.name,
-                "tag": created_user.tag,
+                "puuid": user_data.puuid,
+                "name": user_data.name,
+                "tag": user_data.tag,
                 "current_rank": rank_details["data"]["currenttierpatched"],
                 "elo": rank_details["data"]["elo"]
             }
@@ -259,7 +304,7 @@ async def submit_registration(request: RegistrationRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Registration failed: {e}")
+        logger.error("Registration failed: %s", e)
         raise HTTPException(status_code=500, detail="Registration failed")
 
 # -------------------------------------------------------------
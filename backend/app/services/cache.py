@@ -0,0 +1,24 @@
+"""In-process response caches for read-heavy endpoints"""
+from cachetools import TTLCache
+
+
+# Leaderboard statistics: a single aggregated response
+stats_cache: TTLCache = TTLCache(maxsize=1, ttl=60)
+
+# Top-N players keyed by count (1-100)
+top_players_cache: TTLCache = TTLCache(maxsize=100, ttl=30)
+
+# Serialized registration previews keyed by PUUID. MMR only changes after a
+# match, so a short TTL absorbs retries and multiple tabs without going stale.
+preview_cache: TTLCache = TTLCache(maxsize=1000, ttl=45)
+
+# Raw Riot API responses keyed by endpoint, stored as (generated_at, data).
+# Entries are treated as fresh for a short window per endpoint and kept
+# longer so a stale copy can be served when Riot is unavailable.
+riot_response_cache: TTLCache = TTLCache(maxsize=2000, ttl=600)
+
+
+def clear_leaderboard_caches() -> None:
+    """Drop cached leaderboard data after the set of users changes"""
+    stats_cache.clear()
+    top_players_cache.clear()
@@ -1,14 +1,52 @@
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
 from pymongo.errors import DuplicateKeyError
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from ..config import settings
-from ..models.user import UserInDB, LeaderboardEntry
+from ..models.user import UserInDB
 
 logger = logging.getLogger(__name__)
 
+# Strength 2 compares case-insensitively, matching the discord_username index
+DISCORD_USERNAME_COLLATION = {"locale": "en", "strength": 2}
+
+# Fields a projected leaderboard document must carry to be returned as an entry
+LEADERBOARD_REQUIRED_FIELDS = ("puuid", "name", "tag", "discord_username")
+
+# Fixed projection mapping stored user documents onto LeaderboardEntry fields
+_LEADERBOARD_PROJECT_STAGE = {
+    "$project": {
+        "_id": 0,
+        "puuid": 1,
+        "name": 1,
+        "tag": 1,
+        "discord_username": 1,
+        "current_tier": "$rank_details.data.currenttierpatched",
+        "elo": "$rank_details.data.elo",
+        "rank_in_tier": "$rank_details.data.ranking_in_tier",
+        "peak_rank": "$peak_rank.tier_name",
+        "peak_season": "$peak_rank.season_short",
+        "last_played_match": 1
+    }
+}
+_LEADERBOARD_SORT_STAGE = {"$sort": {"rank_details.data.elo": -1, "puuid": 1}}
+_COUNT_TOTAL_STAGES = [{"$count": "total"}]
+
+# Fixed parts of the leaderboard filter; only the activity cutoff varies per call
+_HAS_VALUE = {"$ne": None}
+_NO_LAST_PLAYED_MATCH = {"last_played_match": {"$exists": False}}  # Include users without this field for backward compatibility
+
+
+class DuplicateUserError(ValueError):
+    """Raised when an insert collides with an existing PUUID or Discord ID"""
+    
+    def __init__(self, field: str, message: str):
+        super().__init__(message)
+        self.field = field
+
 
 class DatabaseService:
     """Service for MongoDB operations"""
@@ -17,23 +55,72 @@ class DatabaseService:
         self.client: Optional[AsyncIOMotorClient] = None
         self.database: Optional[AsyncIOMotorDatabase] = None
         self.collection: Optional[AsyncIOMotorCollection] = None
+        # Whether the unique discord_id index exists, letting inserts enforce it
+        self.discord_id_unique = False
 
     async def connect(self):
         """Connect to MongoDB"""
         try:
-            self.client = AsyncIOMotorClient(settings.mongodb_uri)
+            # tz_aware so stored dates come back as UTC and serialize with an offset.
+            # Bounded timeouts and pool wait make requests fail fast during an
+            # outage instead of piling up behind a stalled connection.
+            self.client = AsyncIOMotorClient(
+                settings.mongodb_uri,
+                tz_aware=True,
+                serverSelectionTimeoutMS=3000,
+                socketTimeoutMS=5000,
+                maxPoolSize=50,
+                minPoolSize=5,
+                waitQueueTimeoutMS=2000,
+                retryWrites=True,
+                compressors="zstd,zlib"
+            )
             self.database = self.client[settings.mongodb_database]
             self.collection = self.database[settings.mongodb_collection]
             
             # Test connection
             await self.client.admin.command('ping')
-            logger.info(f"Connected to MongoDB: {settings.mongodb_database}")
+            logger.info("Connected to MongoDB: %s", settings.mongodb_database)
             
             # Create index on puuid for faster queries
             await self.collection.create_index("puuid", unique=True)
             
+            # Bring any flat rank_details documents into the nested layout
+            await self.normalize_rank_details()
+            
+            # Fill in peak/seasonal fields older updater runs did not write
+            await self.normalize_rank_history()
+            
+            # Convert ISO-string match dates to native BSON dates
+            await self.normalize_last_played_match()
+            
+            # Leaderboard index: ELO descending with puuid as tiebreaker serves the
+            # sort; last_played_match lets the activity filter run on index keys
+            await self.collection.create_index([
+                ("rank_details.data.elo", -1),
+                ("puuid", 1),
+                ("last_played_match", 1)
+            ])
+            
+            # One registration per Discord account, enforced atomically on insert
+            try:
+                await self.collection.create_index(
+                    "discord_id",
+                    unique=True,
+                    partialFilterExpression={"discord_id": {"$type": "number"}}
+                )
+                self.discord_id_unique = True
+            except Exception as e:
+                logger.error("Could not create unique discord_id index (existing duplicates?): %s", e)
+            
+            # Case-insensitive index for Discord username lookups
+            await self.collection.create_index(
+                "discord_username",
+                collation=DISCORD_USERNAME_COLLATION
+            )
+            
         except Exception as e:
-            logger.error(f"Failed to connect to MongoDB: {e}")
+            logger.error("Failed to connect to MongoDB: %s", e)
             raise
 
     async def disconnect(self):
@@ -45,215 +132,327 @@ class DatabaseService:
     async def create_user(self, user_data: UserInDB) -> UserInDB:
         """Create a new user in the database"""
         try:
-            user_dict = user_data.model_dump()
+            # Leave unset optional fields out of the stored document, except
+            # last_played_match: an explicit null keeps never-played users off the
+            # leaderboard, while a missing field is treated as legacy data and shown
+            user_dict = user_data.model_dump(mode="python", exclude_none=True)
+            user_dict.setdefault("last_played_match", None)
             user_dict["_id"] = user_data.puuid  # Use PUUID as MongoDB _id
             
             result = await self.collection.insert_one(user_dict)
-            logger.info(f"Created user with PUUID: {user_data.puuid}")
+            logger.info("Created user with PUUID: %s", user_data.puuid)
             return user_data
             
-        except DuplicateKeyError:
-            logger.warning(f"User with PUUID {user_data.puuid} already exists")
-            raise ValueError(f"User with PUUID {user_data.puuid} already exists")
+        except DuplicateKeyError as e:
+            key_pattern = (e.details or {}).get("keyPattern", {})
+            if "discord_id" in key_pattern:
+                logger.warning("User with Discord ID %s already exists", user_data.discord_id)
+                raise DuplicateUserError("discord_id", f"User with Discord ID {user_data.discord_id} already exists")
+            logger.warning("User with PUUID %s already exists", user_data.puuid)
+            raise DuplicateUserError("puuid", f"User with PUUID {user_data.puuid} already exists")
         except Exception as e:
-            logger.error(f"Failed to create user: {e}")
+            logger.error("Failed to create user: %s", e)
             raise
 
-    async def get_user_by_puuid(self, puuid: str) -> Optional[UserInDB]:
-        """Get user by PUUID"""
+    async def register_if_absent(self, user_data: UserInDB) -> Optional[str]:
+        """Insert a new user unless its PUUID or Discord ID is already registered
+        
+        Uniqueness is checked by the insert itself, so this is one round trip.
+        Returns None on success, or the conflicting field ("puuid" or
+        "discord_id") when the user already exists.
+        """
         try:
-            user_doc = await self.collection.find_one({"puuid": puuid})
-            if user_doc:
-                # Remove MongoDB _id field and convert to UserInDB
-                user_doc.pop("_id", None)
-                return UserInDB(**user_doc)
+            await self.create_user(user_data)
             return None
+        except DuplicateUserError as e:
+            return e.field
+
+    async def get_user_doc_by_puuid(self, puuid: str, projection: Optional[dict] = None) -> Optional[dict]:
+        """Get the raw user document by PUUID, without model validation
+        
+        For callers that only read a few fields; pass a projection to limit
+        what is transferred.
+        """
+        try:
+            return await self.collection.find_one({"puuid": puuid}, projection=projection)
         except Exception as e:
-            logger.error(f"Failed to get user by PUUID {puuid}: {e}")
+            logger.error("Failed to get user document by PUUID %s: %s", puuid, e)
             raise
 
-    async def update_user(self, puuid: str, user_data: UserInDB) -> Optional[UserInDB]:
-        """Update existing user data"""
+    async def get_user_doc_by_discord_id(self, discord_id: int, projection: Optional[dict] = None) -> Optional[dict]:
+        """Get the raw user document by Discord ID, without model validation"""
         try:
-            user_dict = user_data.model_dump()
-            user_dict["updated_at"] = datetime.utcnow()
-            
-            result = await self.collection.replace_one(
-                {"puuid": puuid}, 
-                user_dict
-            )
-            
-            if result.modified_count > 0:
-                logger.info(f"Updated user with PUUID: {puuid}")
-                return user_data
-            return None
-            
+            return await self.collection.find_one({"discord_id": discord_id}, projection=projection)
         except Exception as e:
-            logger.error(f"Failed to update user {puuid}: {e}")
+            logger.error("Failed to get user document by Discord ID %s: %s", discord_id, e)
             raise
 
-    async def get_leaderboard(
-        self, 
-        page: int = 1, 
-        per_page: int = 50
-    ) -> tuple[List[LeaderboardEntry], int]:
-        """Get leaderboard data with pagination - filtering null data and inactive users"""
-        try:
-            from datetime import datetime, timedelta
-            
-            skip = (page - 1) * per_page
-            
-            # Calculate the cutoff date (2 weeks ago)
-            two_weeks_ago = datetime.utcnow() - timedelta(weeks=2)
-            
-            # Pipeline for aggregating leaderboard data
-            pipeline = [
-                {
-                    "$match": {
-                        "$and": [
-                            # Must have ELO data
-                            {
-                                "$or": [
-                                    {"rank_details.data.elo": {"$exists": True, "$ne": None}},
-                                    {"rank_details.elo": {"$exists": True, "$ne": None}}
-                                ]
-                            },
-                            # Must have played within last 2 weeks OR have no last_played_match field (backward compatibility)
-                            {
-                                "$or": [
-                                    {"last_played_match": {"$gte": two_weeks_ago.isoformat()}},
-                                    {"last_played_match": {"$exists": False}}  # Include users without this field for backward compatibility
-                                ]
-                            }
-                        ]
-                    }
-                },
-                {
-                    "$project": {
-                        "puuid": 1,
-                        "name": 1,
-                        "tag": 1,
-                        "discord_username": 1,
-                        "current_tier": {
-                            "$ifNull": ["$rank_details.data.currenttierpatched", "$rank_details.currenttierpatched"]
-                        },
-                        "elo": {
-                            "$ifNull": ["$rank_details.data.elo", "$rank_details.elo"]
-                        },
-                        "rank_in_tier": {
-                            "$ifNull": ["$rank_details.data.ranking_in_tier", "$rank_details.ranking_in_tier"]
-                        },
-                        "peak_rank": "$peak_rank.tier_name",
-                        "peak_season": "$peak_rank.season_short",
-                        "last_played_match": 1
-                    }
-                },
-                {
-                    "$sort": {
-                        "elo": -1  # Sort by ELO descending
-                    }
-                },
-                {
-                    "$skip": skip
-                },
+    def _leaderboard_filter(self) -> dict:
+        """Filter selecting active users with ELO data
+        
+        Shared by the page query and count_leaderboard so totals always
+        agree with the entries that can actually be returned.
+        """
+        # Calculate the cutoff date (2 weeks ago)
+        two_weeks_ago = datetime.utcnow() - timedelta(weeks=2)
+        
+        return {
+            # Must have ELO data
+            "rank_details.data.elo": _HAS_VALUE,
+            # Must have played within last 2 weeks OR have no last_played_match field (backward compatibility)
+            "$or": [
+                {"last_played_match": {"$gte": two_weeks_ago}},
+                _NO_LAST_PLAYED_MATCH
+            ]
+        }
+
+    def _leaderboard_match_stage(self) -> dict:
+        """Build the $match stage selecting active users with ELO data"""
+        return {"$match": self._leaderboard_filter()}
+
+    def _leaderboard_sort_stage(self) -> dict:
+        """Sort by ELO descending with puuid as a stable tiebreaker
+        
+        Sorting on the stored field, before any projection, lets MongoDB walk
+        the (rank_details.data.elo, puuid) index instead of sorting in memory.
+        """
+        return _LEADERBOARD_SORT_STAGE
+
+    def _leaderboard_page_stages(self, skip: int, per_page: int) -> List[dict]:
+        """Build the paging and projection stages for one sorted leaderboard page"""
+        return [
+            {
+                "$skip": skip
+            },
+            {
+                "$limit": per_page
+            },
+            _LEADERBOARD_PROJECT_STAGE
+        ]
+
+    def _leaderboard_after_filter(self, after_elo: int, after_puuid: str) -> dict:
+        """Leaderboard filter restricted to the rows sorted after (after_elo, after_puuid)
+        
+        Applied in the initial $match, so MongoDB seeks straight to the cursor
+        position on the (rank_details.data.elo, puuid) index.
+        """
+        return {
+            "$and": [
+                self._leaderboard_filter(),
                 {
-                    "$limit": per_page
+                    "$or": [
+                        {"rank_details.data.elo": {"$lt": after_elo}},
+                        {"rank_details.data.elo": after_elo, "puuid": {"$gt": after_puuid}}
+                    ]
                 }
             ]
+        }
+
+    async def count_leaderboard(self) -> int:
+        """Count active users with ELO data"""
+        return await self.collection.count_documents(self._leaderboard_filter())
+
+    async def iter_leaderboard(
+        self,
+        page: int = 1,
+        per_page: int = 50
+    ) -> AsyncIterator[dict]:
+        """Stream raw projected leaderboard documents for one page"""
+        skip = (page - 1) * per_page
+        pipeline = [
+            self._leaderboard_match_stage(),
+            self._leaderboard_sort_stage(),
+            *self._leaderboard_page_stages(skip, per_page)
+        ]
+        # One batch sized to the page, so the driver never needs a getMore
+        cursor = self.collection.aggregate(pipeline).batch_size(per_page)
+        
+        async for entry in cursor:
+            skip += 1
+            if any(entry.get(field) is None for field in LEADERBOARD_REQUIRED_FIELDS):
+                logger.error("Skipping invalid leaderboard record %s: %s", skip, entry)
+                continue
+            entry.pop("_id", None)
+            yield entry
+
+    async def get_leaderboard_documents(
+        self,
+        page: int = 1,
+        per_page: int = 50,
+        after_elo: Optional[int] = None,
+        after_puuid: Optional[str] = None
+    ) -> tuple[List[dict], int, Optional[dict]]:
+        """Get one leaderboard page as raw projected documents, the total and the next cursor
+        
+        Pages are addressed by number, or by the (after_elo, after_puuid) keyset
+        cursor of the previous page's last entry when both are given; page is
+        ignored then. Documents missing a required field are dropped. The next
+        cursor points past the last document read, including a dropped one,
+        and is None when the page came back short.
+        """
+        try:
+            if after_elo is not None:
+                # Keyset page: only per_page rows are read however deep it is;
+                # the total is counted separately
+                skip = 0
+                pipeline = [
+                    {"$match": self._leaderboard_after_filter(after_elo, after_puuid)},
+                    self._leaderboard_sort_stage(),
+                    {"$limit": per_page},
+                    _LEADERBOARD_PROJECT_STAGE
+                ]
+                entries_data, total = await asyncio.gather(
+                    self.collection.aggregate(pipeline).to_list(length=per_page),
+                    self.count_leaderboard()
+                )
+            else:
+                skip = (page - 1) * per_page
+                
+                # Fetch the page and the total count in a single round trip
+                pipeline = [
+                    self._leaderboard_match_stage(),
+                    self._leaderboard_sort_stage(),
+                    {
+                        "$facet": {
+                            "entries": self._leaderboard_page_stages(skip, per_page),
+                            "total": _COUNT_TOTAL_STAGES
+                        }
+                    }
+                ]
+                cursor = self.collection.aggregate(pipeline)
+                result = await cursor.to_list(length=1)
+                entries_data = result[0]["entries"] if result else []
+                total = result[0]["total"][0]["total"] if result and result[0]["total"] else 0
             
-            # Get leaderboard entries
-            cursor = self.collection.aggregate(pipeline)
-            entries_data = await cursor.to_list(length=per_page)
+            next_cursor = None
+            if len(entries_data) == per_page:
+                last = entries_data[-1]
+                next_cursor = {"after_elo": last.get("elo"), "after_puuid": last.get("puuid")}
             
-            # Convert to LeaderboardEntry objects with error handling
             entries = []
             for i, entry in enumerate(entries_data):
-                try:
-                    entries.append(LeaderboardEntry(**entry))
-                except Exception as e:
-                    logger.error(f"Failed to create LeaderboardEntry for record {i+skip+1}: {entry}")
-                    logger.error(f"Validation error: {e}")
+                if any(entry.get(field) is None for field in LEADERBOARD_REQUIRED_FIELDS):
+                    logger.error("Skipping invalid leaderboard record %s: %s", i+skip+1, entry)
                     # Skip this entry instead of failing the entire request
                     continue
+                entries.append(entry)
             
-            # Get total count of active users with ELO (both structures)
-            total = await self.collection.count_documents({
-                "$and": [
-                    # Must have ELO data
-                    {
-                        "$or": [
-                            {"rank_details.data.elo": {"$exists": True, "$ne": None}},
-                            {"rank_details.elo": {"$exists": True, "$ne": None}}
-                        ]
-                    },
-                    # Must have played within last 2 weeks
-                    {
-                        "$or": [
-                            {"last_played_match": {"$gte": two_weeks_ago.isoformat()}},
-                            {"last_played_match": {"$exists": False}},  # Include users without this field for backward compatibility
-                            {"last_played_match": None}  # Include null values for backward compatibility
-                        ]
-                    }
-                ]
-            })
-            
-            logger.info(f"Retrieved leaderboard page {page} with {len(entries)} entries")
-            return entries, total
+            logger.info("Retrieved leaderboard page with %s entries", len(entries))
+            return entries, total, next_cursor
             
         except Exception as e:
-            logger.error(f"Failed to get leaderboard: {e}")
+            logger.error("Failed to get leaderboard: %s", e)
             raise
 
-    async def get_user_by_discord_id(self, discord_id: int) -> Optional[UserInDB]:
-        """Get user by Discord ID"""
+    async def normalize_rank_details(self) -> int:
+        """Wrap legacy flat rank_details documents into the nested {data, status} layout
+        
+        Older updater runs stored rank_details.elo / rank_details.currenttierpatched
+        directly. Rewriting them once lets every query read rank_details.data.*
+        without $ifNull fallbacks. Idempotent: already-nested documents are untouched.
+        """
+        result = await self.collection.update_many(
+            {"rank_details": {"$type": "object"}, "rank_details.data": {"$exists": False}},
+            [{"$set": {"rank_details": {"data": "$rank_details", "status": 200}}}]
+        )
+        if result.modified_count:
+            logger.info("Normalized rank_details on %s documents", result.modified_count)
+        return result.modified_count
+
+    async def normalize_rank_history(self) -> int:
+        """Backfill seasonal_ranks[].end_tier_name on updater-written documents
+        
+        Older updater runs stored seasonal entries with only end_tier.name,
+        which failed UserInDB validation. Their peak_rank also lacks rr; that
+        is left missing (PeakRank.rr is optional) rather than invented.
+        Idempotent.
+        """
+        seasonal = await self.collection.update_many(
+            {"seasonal_ranks": {"$elemMatch": {"end_tier_name": {"$exists": False}}}},
+            [{
+                "$set": {
+                    "seasonal_ranks": {
+                        "$map": {
+                            "input": "$seasonal_ranks",
+                            "as": "season",
+                            "in": {
+                                "$mergeObjects": [
+                                    "$$season",
+                                    {
+                                        "end_tier_name": {
+                                            "$ifNull": [
+                                                "$$season.end_tier_name",
+                                                {"$ifNull": ["$$season.end_tier.name", "Unknown"]}
+                                            ]
+                                        }
+                                    }
+                                ]
+                            }
+                        }
+                    }
+                }
+            }]
+        )
+        modified = seasonal.modified_count
+        if modified:
+            logger.info("Backfilled rank history on %s documents", modified)
+        return modified
+
+    async def normalize_last_played_match(self) -> int:
+        """Convert last_played_match values stored as ISO strings into BSON dates
+        
+        Dates compare and index as 8-byte values instead of strings, and the
+        activity filter can use a plain datetime bound. Unparseable strings
+        become null. Idempotent: only string values are touched.
+        """
+        result = await self.collection.update_many(
+            {"last_played_match": {"$type": "string"}},
+            [{
+                "$set": {
+                    "last_played_match": {
+                        "$dateFromString": {"dateString": "$last_played_match", "onError": None}
+                    }
+                }
+            }]
+        )
+        if result.modified_count:
+            logger.info("Converted last_played_match to dates on %s documents", result.modified_count)
+        return result.modified_count
+
+    async def get_users_by_puuids(self, puuids: List[str]) -> Dict[str, dict]:
+        """Fetch summary fields for many users in one query, keyed by PUUID
+        
+        For callers enriching a list of leaderboard rows, instead of one
+        lookup per player.
+        """
         try:
-            user_doc = await self.collection.find_one({"discord_id": discord_id})
-            if user_doc:
-                # Remove MongoDB _id field
-                user_doc.pop("_id", None)
-                try:
-                    return UserInDB(**user_doc)
-                except Exception as validation_error:
-                    logger.warning(f"User {discord_id} exists in DB but failed UserInDB validation: {validation_error}")
-                    # Return a simplified object that indicates the user exists
-                    # This allows the auth flow to detect existing users even with incomplete data
-                    from types import SimpleNamespace
-                    simple_user = SimpleNamespace()
-                    simple_user.puuid = user_doc.get("puuid", "")
-                    simple_user.name = user_doc.get("name", "")
-                    simple_user.tag = user_doc.get("tag", "")
-                    simple_user.discord_id = user_doc.get("discord_id")
-                    simple_user.discord_username = user_doc.get("discord_username", "")
-
-                    # Handle different rank_details structures
-                    rank_details = user_doc.get("rank_details", {})
-                    if isinstance(rank_details, dict):
-                        if "data" in rank_details:
-                            # Legacy structure: rank_details.data.currenttierpatched
-                            current_rank = rank_details.get("data", {}).get("currenttierpatched")
-                        else:
-                            # New structure: rank_details.currenttierpatched
-                            current_rank = rank_details.get("currenttierpatched")
-                    else:
-                        current_rank = None
-
-                    simple_user.rank_details = SimpleNamespace()
-                    simple_user.rank_details.data = SimpleNamespace()
-                    simple_user.rank_details.data.currenttierpatched = current_rank
-
-                    return simple_user
-            return None
+            cursor = self.collection.find(
+                {"puuid": {"$in": puuids}},
+                projection={"_id": 0, "puuid": 1, "name": 1, "tag": 1, "discord_username": 1}
+            )
+            docs = await cursor.to_list(length=len(puuids))
+            return {doc["puuid"]: doc for doc in docs}
         except Exception as e:
-            logger.error(f"Failed to get user by Discord ID {discord_id}: {e}")
+            logger.error("Failed to get users by PUUIDs: %s", e)
             raise
 
     async def user_exists(self, puuid: str) -> bool:
         """Check if user exists by PUUID"""
         try:
-            count = await self.collection.count_documents({"puuid": puuid})
-            return count > 0
+            # Stop at the first hit and transfer only the _id
+            doc = await self.collection.find_one({"puuid": puuid}, projection={"_id": 1})
+            return doc is not None
+        except Exception as e:
+            logger.error("Failed to check user existence %s: %s", puuid, e)
+            raise
+
+    async def discord_exists(self, discord_id: int) -> bool:
+        """Check if a user is registered with the given Discord ID"""
+        try:
+            doc = await self.collection.find_one({"discord_id": discord_id}, projection={"_id": 1})
+            return doc is not None
         except Exception as e:
-            logger.error(f"Failed to check user existence {puuid}: {e}")
+            logger.error("Failed to check Discord user existence %s: %s", discord_id, e)
             raise
 
 
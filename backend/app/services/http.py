@@ -0,0 +1,37 @@
+"""Shared HTTP clients for outbound API calls"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+import httpx
+
+from ..config import settings
+
+# One pooled client for the whole process, so consecutive Riot API calls
+# reuse warm keep-alive connections instead of paying a TCP+TLS handshake each.
+# Opened at import, closed from the FastAPI lifespan.
+riot_client = httpx.AsyncClient(
+    base_url=settings.riot_api_base_url,
+    headers={"Authorization": settings.riot_api_key} if settings.riot_api_key else {},
+    http2=True,
+    timeout=httpx.Timeout(30.0, connect=5.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+)
+
+# Outstanding upstream requests, keyed by request identity (e.g. the URL)
+_inflight: Dict[str, "asyncio.Task[Any]"] = {}
+
+
+async def coalesce(key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+    """Share one in-flight call between concurrent awaiters of the same key
+    
+    The first caller starts factory() as a task; callers arriving before it
+    finishes await the same task instead of issuing a duplicate request.
+    Each awaiter is shielded, so one cancelled caller does not cancel the
+    request for the others.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
@@ -1,10 +1,13 @@
+import asyncio
 import httpx
 import logging
+import orjson
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from ..config import settings
 from ..models.user import UserInDB, RankDetails, RankData, PeakRank, SeasonalRank
+from .http import riot_client, coalesce
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +20,14 @@ class RiotAPIService:
         self.api_key = settings.riot_api_key
         self.region = settings.riot_region
         self.platform = settings.riot_platform
+        self._client = riot_client
 
     async def get_player_mmr_data(self, puuid: str) -> Dict[str, Any]:
         """
         Fetch player MMR data from Riot API
         Endpoint: GET /valorant/v3/by-puuid/mmr/{region}/{platform}/{puuid}
         """
-        url = f"{self.base_url}/valorant/v3/by-puuid/mmr/{self.region}/{self.platform}/{puuid}"
+        url = f"/valorant/v3/by-puuid/mmr/{self.region}/{self.platform}/{puuid}"
         
         headers = {
             "Authorization": self.api_key,
@@ -31,22 +35,25 @@ class RiotAPIService:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, timeout=30.0)
-                response.raise_for_status()
+            # Concurrent lookups of the same player share one upstream request
+            response = await coalesce(
+                f"service:{url}",
+                lambda: self._client.get(url, headers=headers)
+            )
+            response.raise_for_status()
                 
-                data = response.json()
-                logger.info(f"Successfully fetched MMR data for PUUID: {puuid}")
-                return data
+            data = orjson.loads(response.content)
+            logger.info("Successfully fetched MMR data for PUUID: %s", puuid)
+            return data
                 
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error fetching MMR data for {puuid}: {e.response.status_code} - {e.response.text}")
+            logger.error("HTTP error fetching MMR data for %s: %s - %s", puuid, e.response.status_code, e.response.text)
             raise ValueError(f"Failed to fetch player data: HTTP {e.response.status_code}")
         except httpx.TimeoutException:
-            logger.error(f"Timeout fetching MMR data for {puuid}")
+            logger.error("Timeout fetching MMR data for %s", puuid)
             raise ValueError("Request timeout while fetching player data")
         except Exception as e:
-            logger.error(f"Unexpected error fetching MMR data for {puuid}: {e}")
+            logger.error("Unexpected error fetching MMR data for %s: %s", puuid, e)
             raise ValueError(f"Failed to fetch player data: {str(e)}")
 
     async def get_last_competitive_match_date(self, puuid: str) -> Optional[str]:
@@ -54,7 +61,7 @@ class RiotAPIService:
         Fetch the date of the last competitive match for a player
         Endpoint: GET /valorant/v4/by-puuid/matches/{region}/{platform}/{puuid}?mode=competitive&size=1
         """
-        url = f"{self.base_url}/valorant/v4/by-puuid/matches/{self.region}/{self.platform}/{puuid}?mode=competitive&size=1"
+        url = f"/valorant/v4/by-puuid/matches/{self.region}/{self.platform}/{puuid}?mode=competitive&size=1"
         
         headers = {
             "Authorization": self.api_key,
@@ -62,34 +69,33 @@ class RiotAPIService:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers, timeout=30.0)
-                response.raise_for_status()
+            response = await self._client.get(url, headers=headers)
+            response.raise_for_status()
                 
-                data = response.json()
+            data = orjson.loads(response.content)
                 
-                # Extract the last competitive match date
-                if data["status"] == 200 and data["data"] and len(data["data"]) > 0:
-                    last_match = data["data"][0]
-                    if "metadata" in last_match and "started_at" in last_match["metadata"]:
-                        last_played_date = last_match["metadata"]["started_at"]
-                        logger.debug(f"Last competitive match for PUUID {puuid}: {last_played_date}")
-                        return last_played_date
+            # Extract the last competitive match date
+            if data["status"] == 200 and data["data"] and len(data["data"]) > 0:
+                last_match = data["data"][0]
+                if "metadata" in last_match and "started_at" in last_match["metadata"]:
+                    last_played_date = last_match["metadata"]["started_at"]
+                    logger.debug("Last competitive match for PUUID %s: %s", puuid, last_played_date)
+                    return last_played_date
                 
-                logger.debug(f"No recent competitive matches found for PUUID: {puuid}")
-                return None
+            logger.debug("No recent competitive matches found for PUUID: %s", puuid)
+            return None
                 
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
-                logger.warning(f"No competitive matches found for {puuid}")
+                logger.warning("No competitive matches found for %s", puuid)
                 return None
-            logger.error(f"HTTP error fetching last competitive match for {puuid}: {e.response.status_code}")
+            logger.error("HTTP error fetching last competitive match for %s: %s", puuid, e.response.status_code)
             return None
         except httpx.TimeoutException:
-            logger.warning(f"Timeout fetching last competitive match for {puuid}")
+            logger.warning("Timeout fetching last competitive match for %s", puuid)
             return None
         except Exception as e:
-            logger.warning(f"Error fetching last competitive match for {puuid}: {e}")
+            logger.warning("Error fetching last competitive match for %s: %s", puuid, e)
             return None
 
     def _parse_rank_details(self, mmr_data: Dict[str, Any]) -> RankDetails:
@@ -149,11 +155,11 @@ class RiotAPIService:
         Create a complete UserInDB object from PUUID and Discord info
         """
         try:
-            # Fetch MMR data from Riot API
-            mmr_data = await self.get_player_mmr_data(puuid)
-            
-            # Fetch last competitive match date
-            last_competitive_match = await self.get_last_competitive_match_date(puuid)
+            # Fetch MMR data and last competitive match date concurrently
+            mmr_data, last_competitive_match = await asyncio.gather(
+                self.get_player_mmr_data(puuid),
+                self.get_last_competitive_match_date(puuid)
+            )
             
             # Extract account info
             account_data = mmr_data["data"]["account"]
@@ -179,11 +185,11 @@ class RiotAPIService:
                 last_played_match=last_competitive_match
             )
             
-            logger.info(f"Created user object for {account_data['name']}#{account_data['tag']} ({puuid}) - Last competitive match: {last_competitive_match}")
+            logger.info("Created user object for %s#%s (%s) - Last competitive match: %s", account_data['name'], account_data['tag'], puuid, last_competitive_match)
             return user
             
         except Exception as e:
-            logger.error(f"Failed to create user from PUUID {puuid}: {e}")
+            logger.error("Failed to create user from PUUID %s: %s", puuid, e)
             raise
 
 
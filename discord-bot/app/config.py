@@ -1,10 +1,15 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
 
+# The .env file from the project root (parent directory), resolved once
+ENV_FILE = Path(__file__).parent.parent.parent / '.env'
+
+
 class Settings(BaseSettings):
     """Configuration settings for Discord Bot Service"""
     
@@ -26,11 +31,15 @@ class Settings(BaseSettings):
     log_level: str = Field(default='INFO', env='LOG_LEVEL')
     
     class Config:
-        # Use the .env file from the project root (parent directory)
-        env_file = Path(__file__).parent.parent.parent / '.env'
+        env_file = ENV_FILE
         env_file_encoding = 'utf-8'
         case_sensitive = False
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings()
+
+
 # Create settings instance
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
@@ -1,13 +1,19 @@
 import asyncio
+import bisect
 import logging
 import os
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable, AsyncIterator
 
+from aiolimiter import AsyncLimiter
 import discord
 from discord.ext import commands
 import motor.motor_asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from sortedcontainers import SortedKeyList
+
+from .config import Settings
 
 
 # Define intents
@@ -17,16 +23,15 @@ intents.guilds = True
 intents.message_content = True
 
 
-class ScriptFilter(logging.Filter):
-    """Filter to only log messages from this script"""
-    def filter(self, record):
-        return record.pathname == __file__
-
-
 def setup_logging(bot_name: str) -> logging.Logger:
-    """Setup logging configuration for each bot"""
-    logger = logging.getLogger(bot_name)
+    """Setup logging configuration for each bot
+    
+    Each bot gets its own logger that does not propagate, so its handlers
+    only ever see this bot's records and no per-record filter is needed.
+    """
+    logger = logging.getLogger(f'valorantsl.bot.{bot_name}')
     logger.setLevel(logging.INFO)
+    logger.propagate = False
     
     # Ensure logs directory exists
     os.makedirs('logs', exist_ok=True)
@@ -40,8 +45,6 @@ def setup_logging(bot_name: str) -> logging.Logger:
         datefmt='%d/%m/%Y %H:%M:%S'
     )
     handler.setFormatter(formatter)
-    
-    handler.addFilter(ScriptFilter())
     logger.addHandler(handler)
     
     # Also add console handler
@@ -67,30 +70,72 @@ RANK_NAMES_MAPPER = {
     'Radiant': 'Radiant'
 }
 
+# Discord nickname limit and the name length left after each rank suffix
+NICKNAME_MAX_LENGTH = 32
+_NICK_BUDGET = {rank: NICKNAME_MAX_LENGTH - len(f" ({mapped})") for rank, mapped in RANK_NAMES_MAPPER.items()}
+
+# Fields read from each player document by the update loop
+PLAYER_PROJECTION = {
+    '_id': 1,
+    'discord_id': 1,
+    'discord_username': 1,
+    'rank_details.currenttierpatched': 1,
+    'rank_details.data.currenttierpatched': 1
+}
+
+# Member updates in flight at once per bot
+MEMBER_UPDATE_CONCURRENCY = 8
+
+# Member edits per second per bot, just under Discord's guild edit ceiling
+MEMBER_EDIT_RATE = 45
+
+# Operations per bulk_write when syncing Discord data to the database
+BULK_WRITE_BATCH_SIZE = 500
+
 
 class DiscordBotRunner:
     """Discord bot for updating user roles and nicknames based on Valorant ranks"""
     
-    def __init__(self, bot_id: int, config: dict):
+    def __init__(self, bot_id: int, settings: Settings, db_client: AsyncIOMotorClient):
         """
         Initialize the Discord bot
         
         Args:
             bot_id: Bot identifier (1 or 2)
-            config: Configuration dictionary with tokens and settings
+            settings: Service settings with tokens, guild and database configuration
+            db_client: MongoDB client shared by all bots, owned by the caller
         """
         self.bot_id = bot_id
-        self.config = config
+        
+        # Resolve everything the loops need once, rather than per iteration
+        self._guild_id = settings.discord_guild_id
+        self._token = settings.discord_token_1 if bot_id == 1 else settings.discord_token_2
+        self._mongo_database = settings.mongodb_database
+        self._mongo_collection = settings.mongodb_collection
         self.logger = setup_logging(f'bot{bot_id}')
         
+        # Paces member edits; discord.py still handles any 429 it receives
+        self._edit_limiter = AsyncLimiter(MEMBER_EDIT_RATE, 1)
+        
         # Create bot instance with command prefix
         self.bot = commands.Bot(command_prefix='!', intents=intents)
         
-        # MongoDB connection
-        self.db_client = None
+        # MongoDB connection (shared client, closed by the owner)
+        self.db_client = db_client
         self.db = None
         self.collection = None
         
+        # Managed guild roles, resolved by _resolve_roles
+        self._alpha_role: Optional[discord.Role] = None
+        self._omega_role: Optional[discord.Role] = None
+        self._verified_role: Optional[discord.Role] = None
+        self._manual_role: Optional[discord.Role] = None
+        self._unverified_role: Optional[discord.Role] = None
+        self._tier_roles: Dict[str, discord.Role] = {}
+        
+        # Guild members ordered by ID, kept current by join/remove events
+        self._sorted_members: SortedKeyList = SortedKeyList(key=lambda member: member.id)
+        
         # Register events
         self._register_events()
         
@@ -99,165 +144,297 @@ class DiscordBotRunner:
         
         @self.bot.event
         async def on_ready():
-            self.logger.info(f'{self.bot.user} has connected to Discord!')
+            self.logger.info('%s has connected to Discord!', self.bot.user)
             # Initialize database connection
             await self._init_database()
+            # Resolve managed roles once
+            guild = self.bot.get_guild(self._guild_id)
+            if guild:
+                self._resolve_roles(guild)
+                # Sort members once; join/remove events maintain the order
+                self._sorted_members = SortedKeyList(guild.members, key=lambda member: member.id)
             # Start the main update loop
             self.bot.loop.create_task(self.main_loop())
         
+        # Keep resolved roles in sync with role changes in the guild
+        async def refresh_roles(role: discord.Role, *_):
+            if role.guild.id == self._guild_id:
+                self._resolve_roles(role.guild)
+        
+        self.bot.add_listener(refresh_roles, 'on_guild_role_create')
+        self.bot.add_listener(refresh_roles, 'on_guild_role_delete')
+        self.bot.add_listener(refresh_roles, 'on_guild_role_update')
+        
+        # Keep the sorted member list in step with membership changes
+        async def track_join(member: discord.Member):
+            if member.guild.id == self._guild_id:
+                self._sorted_members.discard(member)
+                self._sorted_members.add(member)
+        
+        async def track_remove(member: discord.Member):
+            if member.guild.id == self._guild_id:
+                self._sorted_members.discard(member)
+        
+        self.bot.add_listener(track_join, 'on_member_join')
+        self.bot.add_listener(track_remove, 'on_member_remove')
+        
         # Only bot 1 handles new member joins
         if self.bot_id == 1:
             @self.bot.event
             async def on_member_join(member):
-                guild = self.bot.get_guild(self.config['discord_guild_id'])
+                guild = self.bot.get_guild(self._guild_id)
                 if guild:
-                    self.logger.info(f'New member joined: {member.name} (ID: {member.id})')
-                    db_response = await self.get_all_players_from_db()
-                    if db_response:
-                        await self.update_discord_roles(member, db_response)
+                    self.logger.info('New member joined: %s (ID: %s)', member.name, member.id)
+                    players = await self.load_player_index([member.id])
+                    if players is not None:
+                        id_index, _ = players
+                        await self.update_discord_roles(member, id_index)
     
     async def _init_database(self):
-        """Initialize MongoDB connection"""
+        """Initialize MongoDB collection handles on the shared client"""
         try:
-            self.db_client = AsyncIOMotorClient(self.config['mongodb_uri'])
-            self.db = self.db_client[self.config['mongodb_database']]
-            self.collection = self.db[self.config['mongodb_collection']]
+            self.db = self.db_client[self._mongo_database]
+            self.collection = self.db[self._mongo_collection]
             
             # Test connection
             await self.db_client.admin.command('ping')
             self.logger.info("Successfully connected to MongoDB")
         except Exception as e:
-            self.logger.error(f"Failed to connect to MongoDB: {e}")
+            self.logger.error("Failed to connect to MongoDB: %s", e)
             raise
     
-    async def get_all_players_from_db(self) -> Optional[List[Dict[str, Any]]]:
+    async def iter_players(self, query: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
         """
-        Fetch all players from the database
+        Stream player documents from the database, one cursor batch at a time
         
+        Args:
+            query: MongoDB filter, all players if omitted
+            
+        Yields:
+            Player documents with only the fields the role/nickname updates read
+        """
+        cursor = self.collection.find(query or {}, PLAYER_PROJECTION).batch_size(500)
+        async for player in cursor:
+            yield player
+    
+    async def load_player_index(
+        self,
+        discord_ids: Optional[List[int]] = None
+    ) -> Optional[Tuple[Dict[int, Dict[str, Any]], List[int]]]:
+        """
+        Index players by Discord ID, streaming them straight from the cursor
+        
+        Args:
+            discord_ids: Only load players registered with these Discord IDs
+                (served by the discord_id index the backend maintains);
+                all players if omitted
+            
         Returns:
-            List of player documents or None if error
+            Mapping of Discord ID to player document and the sorted Discord IDs,
+            or None if error
         """
+        query = None
+        if discord_ids is not None:
+            ids = [int(discord_id) for discord_id in discord_ids]
+            # Some documents store discord_id as a string; match both forms
+            query = {'discord_id': {'$in': ids + [str(discord_id) for discord_id in ids]}}
+        
         try:
-            cursor = self.collection.find({})
-            players = await cursor.to_list(length=None)
-            self.logger.info(f"Successfully retrieved {len(players)} players from database")
-            return players
+            id_index = {}
+            async for player in self.iter_players(query):
+                if player.get('discord_id'):
+                    id_index[int(player['discord_id'])] = player
+            self.logger.info("Successfully retrieved %d players from database", len(id_index))
+            return id_index, sorted(id_index)
         except Exception as e:
-            self.logger.error(f"Failed to get players from database: {e}")
+            self.logger.error("Failed to get players from database: %s", e)
             return None
     
-    async def update_database_discord_data(self, member: discord.Member, db_response: List[Dict[str, Any]]):
+    def discord_data_update(
+        self,
+        member: discord.Member,
+        id_index: Dict[int, Dict[str, Any]],
+        sorted_ids: List[int]
+    ) -> Optional[UpdateOne]:
         """
-        Update Discord ID and username in database if they've changed slightly
+        Build the write refreshing a member's Discord ID and username, if they've changed slightly
         
         Args:
             member: Discord member object
-            db_response: List of player documents from database
+            id_index: Player documents keyed by Discord ID
+            sorted_ids: Sorted Discord IDs from id_index
+            
+        Returns:
+            UpdateOne operation, or None if nothing needs to change
         """
         discord_id = int(member.id)
         discord_username = member.name
         
-        match_found = False
+        # Nearest stored ID on either side of the member's ID
+        pos = bisect.bisect_left(sorted_ids, discord_id)
+        neighbours = sorted_ids[max(pos - 1, 0):pos + 1]
+        db_discord_id = min(neighbours, key=lambda other: abs(discord_id - other), default=None)
+        
+        # Check if Discord ID is within range (handles slight ID changes)
+        if db_discord_id is None or abs(discord_id - db_discord_id) > 200:
+            self.logger.info("Discord ID %s not found in database. Username: %s", discord_id, discord_username)
+            return None
+        
+        database_user = id_index[db_discord_id]
+        db_username = database_user.get('discord_username', '')
         
-        for database_user in db_response:
-            db_discord_id = database_user.get('discord_id')
-            if not db_discord_id:
+        # Update if ID or username changed
+        if db_discord_id == discord_id and db_username == discord_username:
+            return None
+        
+        self.logger.info(
+            "Updating database discord_id | %s --> %s, discord_username | %s --> %s",
+            db_discord_id, discord_id, db_username, discord_username
+        )
+        # The diff is repeated in the filter so the server matches nothing, and
+        # writes nothing (no updated_at bump, no oplog entry), if the stored
+        # values already equal the member's current ones
+        return UpdateOne(
+            {
+                '_id': database_user['_id'],
+                '$or': [
+                    {'discord_id': {'$ne': discord_id}},
+                    {'discord_username': {'$ne': discord_username}}
+                ]
+            },
+            {'$set': {
+                'discord_id': discord_id,
+                'discord_username': discord_username,
+                'updated_at': datetime.utcnow().isoformat() + 'Z'
+            }}
+        )
+    
+    async def update_database_discord_data(
+        self,
+        members: List[discord.Member],
+        id_index: Dict[int, Dict[str, Any]],
+        sorted_ids: List[int]
+    ):
+        """
+        Update Discord IDs and usernames in database for members whose data changed
+        
+        Writes are sent in unordered bulk batches rather than one round trip each.
+        
+        Args:
+            members: Discord members to sync
+            id_index: Player documents keyed by Discord ID
+            sorted_ids: Sorted Discord IDs from id_index
+        """
+        ops = []
+        for member in members:
+            if member.bot:
                 continue
-                
-            db_discord_id = int(db_discord_id)
-            db_username = database_user.get('discord_username', '')
-            
-            # Check if Discord ID is within range (handles slight ID changes)
-            if abs(discord_id - db_discord_id) <= 200:
-                match_found = True
-                
-                # Update if ID or username changed
-                if db_discord_id != discord_id or db_username != discord_username:
-                    try:
-                        await self.collection.update_one(
-                            {'_id': database_user['_id']},
-                            {'$set': {
-                                'discord_id': discord_id,
-                                'discord_username': discord_username,
-                                'updated_at': datetime.utcnow().isoformat() + 'Z'
-                            }}
-                        )
-                        self.logger.info(
-                            f"Updated database discord_id | {db_discord_id} --> {discord_id}, "
-                            f"discord_username | {db_username} --> {discord_username}"
-                        )
-                    except Exception as e:
-                        self.logger.error(f"Failed to update Discord data: {e}")
-                break
+            op = self.discord_data_update(member, id_index, sorted_ids)
+            if op is not None:
+                ops.append(op)
         
-        if not match_found:
-            self.logger.info(f"Discord ID {discord_id} not found in database. Username: {discord_username}")
+        for start in range(0, len(ops), BULK_WRITE_BATCH_SIZE):
+            batch = ops[start:start + BULK_WRITE_BATCH_SIZE]
+            try:
+                result = await self.collection.bulk_write(batch, ordered=False)
+                self.logger.info("Updated Discord data for %d players", result.modified_count)
+            except Exception as e:
+                self.logger.error("Failed to update Discord data: %s", e)
     
-    async def update_nickname(self, member: discord.Member, global_name: str, rank_tier: str):
+    def build_nickname(self, global_name: str, rank_tier: str) -> str:
         """
-        Update member's nickname with their rank
+        Build a member's nickname with their rank
         
         Args:
-            member: Discord member object
             global_name: Member's global display name
             rank_tier: Current rank tier
+            
+        Returns:
+            Nickname within Discord's length limit
         """
         mapped_rank = RANK_NAMES_MAPPER.get(rank_tier, rank_tier)
-        new_nickname = f"{global_name} ({mapped_rank})"
-        
-        # Limit nickname length to Discord's 32 character limit
-        if len(new_nickname) > 32:
-            # Truncate the name part, keeping the rank
-            max_name_length = 32 - len(f" ({mapped_rank})")
-            global_name = global_name[:max_name_length]
-            new_nickname = f"{global_name} ({mapped_rank})"
         
-        try:
-            await member.edit(nick=new_nickname)
-            self.logger.info(f"Updated display name for discord username: {member.name} -> {new_nickname}")
-        except discord.errors.Forbidden:
-            self.logger.warning(f"Bot does not have permissions to update display name for discord username: {member.name}")
-        except Exception as e:
-            self.logger.error(f"Error updating nickname for {member.name}: {e}")
+        # Truncate the name part so the rank suffix fits Discord's limit
+        budget = _NICK_BUDGET.get(rank_tier)
+        if budget is None:
+            budget = NICKNAME_MAX_LENGTH - len(f" ({mapped_rank})")
+        return f"{global_name[:budget]} ({mapped_rank})"
     
-    async def update_roles(self, member: discord.Member, new_roles: List[discord.Role]):
+    async def update_member(
+        self,
+        member: discord.Member,
+        new_nickname: str,
+        new_roles: Optional[List[discord.Role]] = None
+    ):
         """
-        Update member's roles
+        Update member's nickname and roles in a single request
+        
+        Only the fields that differ are sent, and nothing is sent when the
+        member is already up to date.
         
         Args:
             member: Discord member object
-            new_roles: List of new roles to assign
+            new_nickname: Nickname to set
+            new_roles: Roles to assign, or None to leave roles untouched
         """
-        try:
-            # Get all current roles except @everyone
-            roles_to_remove = [role for role in member.roles if role.name != "@everyone"]
-            
-            if roles_to_remove:
-                await member.remove_roles(*roles_to_remove)
-                self.logger.info(f"{member.name} : Removed roles: {', '.join(role.name for role in roles_to_remove)}")
-            else:
-                self.logger.info(f"{member.name} : No roles to remove")
-            
-            if new_roles:
-                # Filter out None values
-                new_roles = [role for role in new_roles if role is not None]
-                if new_roles:
-                    await member.add_roles(*new_roles)
-                    self.logger.info(f"{member.name} : Added roles: {', '.join(role.name for role in new_roles)}")
+        changes: Dict[str, Any] = {}
+        
+        if member.nick != new_nickname:
+            changes['nick'] = new_nickname
         
+        removed = added = set()
+        if new_roles is not None:
+            # Diff current roles (except @everyone) against the desired set
+            current = {role for role in member.roles if role.name != "@everyone"}
+            desired = {role for role in new_roles if role is not None}
+            if current != desired:
+                changes['roles'] = list(desired)
+                removed = current - desired
+                added = desired - current
+        
+        if not changes:
+            return
+        
+        try:
+            async with self._edit_limiter:
+                await member.edit(**changes, reason="rank sync")
         except discord.errors.Forbidden:
-            self.logger.warning(f"Bot does not have permissions to update roles for discord username: {member.name}")
+            # Nicknames of members above the bot (e.g. the owner) cannot be
+            # changed; still apply the roles on their own
+            if 'nick' in changes and 'roles' in changes:
+                self.logger.warning("Bot does not have permissions to update display name for discord username: %s", member.name)
+                changes.pop('nick')
+                try:
+                    async with self._edit_limiter:
+                        await member.edit(**changes, reason="rank sync")
+                except discord.errors.Forbidden:
+                    self.logger.warning("Bot does not have permissions to update roles for discord username: %s", member.name)
+                    return
+            else:
+                self.logger.warning("Bot does not have permissions to update member: %s", member.name)
+                return
         except discord.errors.NotFound as e:
-            self.logger.error(f"Role not found in the server: {e}")
+            self.logger.error("Role not found in the server: %s", e)
+            return
         except Exception as e:
-            self.logger.error(f"Error updating roles for {member.name}: {e}")
+            self.logger.error("Error updating %s: %s", member.name, e)
+            return
+        
+        # Skip building the role lists when INFO is filtered out
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        if 'nick' in changes:
+            self.logger.info("Updated display name for discord username: %s -> %s", member.name, new_nickname)
+        if removed:
+            self.logger.info("%s : Removed roles: %s", member.name, ', '.join(role.name for role in removed))
+        if added:
+            self.logger.info("%s : Added roles: %s", member.name, ', '.join(role.name for role in added))
     
-    async def get_new_roles(self, member: discord.Member, rank_tier: str) -> List[discord.Role]:
+    async def get_new_roles(self, rank_tier: str) -> List[discord.Role]:
         """
         Get the new roles for a member based on their rank
         
         Args:
-            member: Discord member object
             rank_tier: Current rank tier
             
         Returns:
@@ -266,38 +443,27 @@ class DiscordBotRunner:
         new_roles = []
         
         if rank_tier in ALPHA_RANKS:
-            alpha_role = discord.utils.get(member.guild.roles, name="Alpha")
-            rank_role = discord.utils.get(member.guild.roles, name=rank_tier)
-            verified_role = discord.utils.get(member.guild.roles, name="Verified")
-            new_roles = [alpha_role, rank_role, verified_role]
+            new_roles = [self._alpha_role, self._tier_roles.get(rank_tier), self._verified_role]
         elif rank_tier in OMEGA_RANKS:
-            omega_role = discord.utils.get(member.guild.roles, name="Omega")
-            rank_role = discord.utils.get(member.guild.roles, name=rank_tier)
-            verified_role = discord.utils.get(member.guild.roles, name="Verified")
-            new_roles = [omega_role, rank_role, verified_role]
+            new_roles = [self._omega_role, self._tier_roles.get(rank_tier), self._verified_role]
         
         # Filter out None values
         new_roles = [role for role in new_roles if role is not None]
         return new_roles
     
-    async def update_discord_roles(self, member: discord.Member, db_response: List[Dict[str, Any]]):
+    async def update_discord_roles(self, member: discord.Member, id_index: Dict[int, Dict[str, Any]]):
         """
         Update a member's Discord roles and nickname based on their Valorant rank
         
         Args:
             member: Discord member object
-            db_response: List of player documents from database
+            id_index: Player documents keyed by Discord ID
         """
         global_name = member.global_name or member.name
         discord_id = int(member.id)
         discord_username = member.name
         
-        # Find the user in db_response
-        user_data = None
-        for user in db_response:
-            if user.get('discord_id') and int(user['discord_id']) == discord_id:
-                user_data = user
-                break
+        user_data = id_index.get(discord_id)
         
         if user_data:
             # Handle both new and legacy database schemas
@@ -314,25 +480,51 @@ class DiscordBotRunner:
             # Extract tier name (e.g., "Diamond 3" -> "Diamond")
             rank_tier = rank.split(' ')[0] if rank != 'Unknown' else 'Unknown'
             
-            # Update nickname
-            await self.update_nickname(member, global_name, rank_tier)
+            new_nickname = self.build_nickname(global_name, rank_tier)
             
             # Check for "Manual" role - skip role updates if present
-            manual_role = discord.utils.get(member.guild.roles, name="Manual")
-            if manual_role in member.roles:
-                self.logger.info(f"Skipping role update for {discord_username} as they have 'Manual' role.")
+            if self._manual_role is not None and self._manual_role in member.roles:
+                self.logger.info("Skipping role update for %s as they have 'Manual' role.", discord_username)
+                await self.update_member(member, new_nickname)
                 return
             
-            # Get and update roles
-            new_roles = await self.get_new_roles(member, rank_tier)
-            await self.update_roles(member, new_roles)
+            # Nickname and roles go out in one request
+            new_roles = await self.get_new_roles(rank_tier)
+            await self.update_member(member, new_nickname, new_roles)
         
         else:
             # User not found in database - mark as unverified
-            unverified_role = discord.utils.get(member.guild.roles, name="Unverified")
-            new_roles = [unverified_role] if unverified_role else []
-            await self.update_roles(member, new_roles)
-            await self.update_nickname(member, global_name, "Unverified")
+            new_roles = [self._unverified_role] if self._unverified_role else []
+            await self.update_member(member, self.build_nickname(global_name, "Unverified"), new_roles)
+    
+    async def for_each_member(
+        self,
+        members: List[discord.Member],
+        update: Callable[[discord.Member], Awaitable[None]]
+    ):
+        """
+        Run an update for every non-bot member with bounded concurrency
+        
+        discord.py queues requests per rate-limit bucket and retries 429s
+        itself, so a small number of in-flight updates replaces fixed sleeps.
+        
+        Args:
+            members: Discord members to process
+            update: Coroutine function applied to each member
+        """
+        semaphore = asyncio.Semaphore(MEMBER_UPDATE_CONCURRENCY)
+        
+        async def bounded(member: discord.Member):
+            async with semaphore:
+                await update(member)
+        
+        results = await asyncio.gather(
+            *(bounded(member) for member in members if not member.bot),  # Skip bot accounts
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error("Member update failed: %s", result)
     
     async def main_loop(self):
         """Main update loop that runs every 15 minutes"""
@@ -340,42 +532,54 @@ class DiscordBotRunner:
         
         while not self.bot.is_closed():
             try:
-                guild = self.bot.get_guild(self.config['discord_guild_id'])
+                guild = self.bot.get_guild(self._guild_id)
                 if guild:
-                    # Get all players from database
-                    db_response = await self.get_all_players_from_db()
+                    # Members are kept sorted by ID for consistent splitting;
+                    # snapshot them so events during the cycle don't shift the split
+                    members = list(self._sorted_members)
+                    half_members = len(members) // 2
                     
-                    if db_response:
-                        # Sort members by ID for consistent splitting
-                        members = sorted(guild.members, key=lambda member: member.id)
-                        half_members = len(members) // 2
-                        
-                        # Split work between bots
-                        if self.bot_id == 1:
-                            target_members = members[:half_members]  # First half
-                        else:
-                            target_members = members[half_members:]  # Second half
+                    # Split work between bots
+                    if self.bot_id == 1:
+                        target_members = members[:half_members]  # First half
+                    else:
+                        target_members = members[half_members:]  # Second half
+                    
+                    # Index players once per iteration for O(1) member lookups
+                    if self.bot_id == 1:
+                        # Bot 1's Discord data sync fuzzy-matches every member, so it needs all players
+                        players = await self.load_player_index()
+                    else:
+                        # Only the assigned members' players, via the discord_id index
+                        players = await self.load_player_index(
+                            [member.id for member in target_members if not member.bot]
+                        )
+                    
+                    if players is None:
+                        self.logger.error("Failed to retrieve database response")
+                    elif self.bot_id == 1 and not players[0]:
+                        # An empty full load means the collection is unavailable
+                        # (e.g. mid migration or restore), not that nobody is
+                        # registered; acting on it would strip every member's roles
+                        self.logger.warning("No players found in database, skipping this iteration")
+                    else:
+                        id_index, sorted_ids = players
                         
-                        self.logger.info(f"Bot {self.bot_id} processing {len(target_members)} members")
+                        self.logger.info("Bot %d processing %d members", self.bot_id, len(target_members))
                         
                         # Update roles for assigned members
-                        for member in target_members:
-                            if not member.bot:  # Skip bot accounts
-                                await self.update_discord_roles(member, db_response)
-                                await asyncio.sleep(0.5)  # Rate limiting
+                        await self.for_each_member(
+                            target_members,
+                            lambda member: self.update_discord_roles(member, id_index)
+                        )
                         
                         # Bot 1 also updates database discord data for all members
                         if self.bot_id == 1:
                             self.logger.info("Bot 1 updating database Discord data for all members")
-                            for member in members:
-                                if not member.bot:
-                                    await self.update_database_discord_data(member, db_response)
-                                    await asyncio.sleep(0.5)  # Rate limiting
-                    else:
-                        self.logger.error("Failed to retrieve database response")
+                            await self.update_database_discord_data(members, id_index, sorted_ids)
                 
             except Exception as e:
-                self.logger.error(f"Error in main loop: {e}", exc_info=True)
+                self.logger.error("Error in main loop: %s", e, exc_info=True)
             
             finally:
                 self.logger.info("Sleeping for 15 minutes before next iteration.")
@@ -383,11 +587,8 @@ class DiscordBotRunner:
     
     async def run(self):
         """Run the bot"""
-        token = self.config[f'discord_token_{self.bot_id}']
-        await self.bot.start(token)
+        await self.bot.start(self._token)
     
     async def close(self):
-        """Close database connection and bot"""
-        if self.db_client:
-            self.db_client.close()
+        """Close the bot; the shared database client is closed by its owner"""
         await self.bot.close()
\ No newline at end of file
@@ -10,6 +10,8 @@ import sys
 import logging
 from typing import Optional
 
+from motor.motor_asyncio import AsyncIOMotorClient
+
 from app.discord_bots import DiscordBotRunner
 from app.config import settings
 
@@ -29,6 +31,7 @@ class BotManager:
     def __init__(self):
         self.bot1: Optional[DiscordBotRunner] = None
         self.bot2: Optional[DiscordBotRunner] = None
+        self.mongo_client: Optional[AsyncIOMotorClient] = None
         self.running = False
         
         # Setup signal handlers for graceful shutdown
@@ -37,7 +40,7 @@ class BotManager:
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
-        logger.info(f"Received signal {signum}, initiating graceful shutdown...")
+        logger.info("Received signal %s, initiating graceful shutdown...", signum)
         self.running = False
         
         # Schedule shutdown
@@ -56,33 +59,33 @@ class BotManager:
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
         
+        # Both bots share one MongoDB client, so close it once here
+        if self.mongo_client:
+            self.mongo_client.close()
+            self.mongo_client = None
+        
         logger.info("Discord bots shut down successfully")
     
     async def run(self):
         """Run both Discord bots concurrently"""
         self.running = True
         
-        # Create configuration for bots
-        config = {
-            'discord_token_1': settings.discord_token_1,
-            'discord_token_2': settings.discord_token_2,
-            'discord_guild_id': settings.discord_guild_id,
-            'mongodb_uri': settings.mongodb_uri,
-            'mongodb_database': settings.mongodb_database,
-            'mongodb_collection': settings.mongodb_collection,
-            'update_interval_minutes': settings.update_interval_minutes,
-            'rate_limit_delay': settings.rate_limit_delay
-        }
+        # One MongoDB client (and connection pool) shared by both bots
+        self.mongo_client = AsyncIOMotorClient(
+            settings.mongodb_uri,
+            maxPoolSize=50,
+            serverSelectionTimeoutMS=5000
+        )
         
         # Initialize bots
-        self.bot1 = DiscordBotRunner(bot_id=1, config=config)
-        self.bot2 = DiscordBotRunner(bot_id=2, config=config)
+        self.bot1 = DiscordBotRunner(bot_id=1, settings=settings, db_client=self.mongo_client)
+        self.bot2 = DiscordBotRunner(bot_id=2, settings=settings, db_client=self.mongo_client)
         
         logger.info("Starting Discord Bot Service...")
-        logger.info(f"Guild ID: {settings.discord_guild_id}")
-        logger.info(f"MongoDB Database: {settings.mongodb_database}")
-        logger.info(f"MongoDB Collection: {settings.mongodb_collection}")
-        logger.info(f"Update Interval: {settings.update_interval_minutes} minutes")
+        logger.info("Guild ID: %s", settings.discord_guild_id)
+        logger.info("MongoDB Database: %s", settings.mongodb_database)
+        logger.info("MongoDB Collection: %s", settings.mongodb_collection)
+        logger.info("Update Interval: %s minutes", settings.update_interval_minutes)
         
         # Run both bots concurrently
         try:
@@ -93,11 +96,20 @@ class BotManager:
         except KeyboardInterrupt:
             logger.info("Received keyboard interrupt")
         except Exception as e:
-            logger.error(f"Error running bots: {e}", exc_info=True)
+            logger.error("Error running bots: %s", e, exc_info=True)
         finally:
             await self.shutdown()
 
 
+def install_uvloop():
+    """Use uvloop's event loop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 async def main():
     """Main entry point"""
     manager = BotManager()
@@ -105,11 +117,12 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Application terminated by user")
         sys.exit(0)
     except Exception as e:
-        logger.error(f"Fatal error: {e}", exc_info=True)
+        logger.error("Fatal error: %s", e, exc_info=True)
         sys.exit(1)
\ No newline at end of file
@@ -1,8 +1,13 @@
 import os
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
 
+# Use root-level .env file
+ENV_FILE = "../.env"
+
+
 class UpdaterSettings(BaseSettings):
     """Configuration settings for the updater service"""
     
@@ -19,7 +24,9 @@ class UpdaterSettings(BaseSettings):
     
     # Update Configuration
     update_interval_minutes: int = Field(default=30)
-    rate_limit_delay: float = Field(default=2.5)
+    requests_per_second: float = Field(default=1.0)
+    request_burst: int = Field(default=5)
+    max_concurrent_players: int = Field(default=8)
     batch_size: int = Field(default=50)
     max_retries: int = Field(default=3)
     retry_delay: float = Field(default=5.0)
@@ -29,11 +36,18 @@ class UpdaterSettings(BaseSettings):
     log_file: str = Field(default="updater.log")
     
     class Config:
-        env_file = "../.env"  # Use root-level .env file
+        env_file = ENV_FILE
         env_file_encoding = "utf-8"
         case_sensitive = False
         extra = "ignore"  # Ignore extra fields from the .env file
+        frozen = True  # Loaded once at startup and shared, never mutated
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> UpdaterSettings:
+    """Parse the environment and .env once for every updater module"""
+    return UpdaterSettings()
 
 
 # Global settings instance
-settings = UpdaterSettings()
\ No newline at end of file
+settings = get_settings()
@@ -1,7 +1,9 @@
 import logging
-from typing import List, Optional, Dict, Any
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
-from pymongo.errors import ConnectionFailure
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure
 try:
     from .config import settings
 except ImportError:
@@ -9,6 +11,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Player documents fetched per cursor round trip when streaming players
+PLAYER_CURSOR_BATCH_SIZE = 1000
+
 
 class DatabaseManager:
     """MongoDB database manager for the updater service"""
@@ -29,6 +34,14 @@ class DatabaseManager:
             database = self.client[settings.mongodb_database]
             self.collection = database[settings.mongodb_collection]
             
+            # The PUUID listing and per-player writes look players up by
+            # puuid; the backend creates the same index, so this is a no-op
+            # when it already exists
+            try:
+                await self.collection.create_index([("puuid", 1)], unique=True)
+            except Exception as e:
+                logger.warning(f"Could not ensure puuid index: {e}")
+            
             logger.info(f"Successfully connected to MongoDB: {settings.mongodb_database}")
             return True
             
@@ -45,20 +58,34 @@ class DatabaseManager:
             self.client.close()
             logger.info("Disconnected from MongoDB")
     
+    async def iter_players(self) -> AsyncIterator[Dict[str, Any]]:
+        """Stream PUUIDs and basic player info from the database
+        
+        Documents are yielded as each cursor batch arrives, so callers can
+        start work before the whole collection has been read.
+        """
+        cursor = self.collection.find(
+            {},  # No filter - get all documents
+            {
+                "puuid": 1,
+                "name": 1,
+                "tag": 1,
+                "games_played": 1,
+                "last_played_match": 1,
+                "rank_hash": 1,
+                "mmr_etag": 1,
+                "mmr_digest": 1,
+                "_id": 0
+            }
+        ).batch_size(PLAYER_CURSOR_BATCH_SIZE)
+        
+        async for player in cursor:
+            yield player
+    
     async def get_all_puuids(self) -> List[Dict[str, Any]]:
         """Get all PUUIDs and basic player info from the database"""
         try:
-            cursor = self.collection.find(
-                {},  # No filter - get all documents
-                {
-                    "puuid": 1,
-                    "name": 1,
-                    "tag": 1,
-                    "_id": 0
-                }
-            )
-            
-            players = await cursor.to_list(length=None)
+            players = [player async for player in self.iter_players()]
             logger.info(f"Retrieved {len(players)} players from database")
             return players
             
@@ -66,11 +93,12 @@ class DatabaseManager:
             logger.error(f"Failed to retrieve PUUIDs from database: {e}")
             return []
     
-    async def update_player_data(self, puuid: str, update_data: Dict[str, Any]) -> bool:
+    async def update_player_data(self, puuid: str, update_data: Dict[str, Any], updated_at: Optional[datetime] = None) -> bool:
         """Update player data in the database"""
         try:
             # Remove region from update data since we don't update it
             update_data.pop('region', None)
+            update_data["updated_at"] = updated_at or datetime.utcnow()
             
             result = await self.collection.update_one(
                 {"puuid": puuid},
@@ -88,11 +116,48 @@ class DatabaseManager:
             logger.error(f"Failed to update player {puuid}: {e}")
             return False
     
+    async def bulk_update_players(
+        self,
+        updates: List[Tuple[str, Dict[str, Any]]],
+        updated_at: Optional[datetime] = None
+    ) -> int:
+        """Update many players in one unordered bulk write
+        
+        Every player in the batch gets the same updated_at (the update
+        cycle's timestamp when given). Returns the number of players whose
+        update was applied.
+        """
+        if not updates:
+            return 0
+        
+        now = updated_at or datetime.utcnow()
+        operations = []
+        for puuid, update_data in updates:
+            # Remove region from update data since we don't update it
+            update_data.pop('region', None)
+            operations.append(UpdateOne({"puuid": puuid}, {"$set": {**update_data, "updated_at": now}}))
+        
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            logger.debug(f"Bulk updated {len(operations)} players ({result.modified_count} modified)")
+            return len(operations)
+            
+        except BulkWriteError as e:
+            failed = len(e.details.get("writeErrors", []))
+            logger.error(f"Bulk update failed for {failed} of {len(operations)} players: {e.details.get('writeErrors', [])[:3]}")
+            return len(operations) - failed
+        except Exception as e:
+            logger.error(f"Failed to bulk update {len(operations)} players: {e}")
+            return 0
+    
     async def get_player_count(self) -> int:
-        """Get total number of players in the database"""
+        """Approximate number of players, from collection metadata
+        
+        Only used for progress logging, so the exact count_documents scan
+        is not worth its cost.
+        """
         try:
-            count = await self.collection.count_documents({})
-            return count
+            return await self.collection.estimated_document_count()
         except Exception as e:
             logger.error(f"Failed to get player count: {e}")
             return 0
@@ -16,17 +16,18 @@ import logging
 import argparse
 import signal
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-import schedule
-import time
+from typing import Optional
 
 try:
     from .config import settings
     from .updater import player_updater
+    from .riot_api import riot_api
 except ImportError:
     from config import settings
     from updater import player_updater
+    from riot_api import riot_api
 
 
 class UpdaterService:
@@ -34,8 +35,9 @@ class UpdaterService:
     
     def __init__(self):
         self.running = False
+        self._shutdown_event: Optional[asyncio.Event] = None
+        self._update_task: Optional[asyncio.Task] = None
         self.setup_logging()
-        self.setup_signal_handlers()
     
     def setup_logging(self):
         """Configure comprehensive logging"""
@@ -79,27 +81,13 @@ class UpdaterService:
         
         logging.info(f"Logging configured - Level: {settings.log_level}")
     
-    def setup_signal_handlers(self):
-        """Setup graceful shutdown handlers"""
-        def signal_handler(signum, frame):
-            logging.info(f"Received signal {signum}, shutting down gracefully...")
-            self.running = False
-        
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
-    
-    def scheduled_update(self):
+    async def scheduled_update(self):
         """Wrapper for scheduled updates"""
         try:
             logging.info("🚀 Starting scheduled player update")
-            stats = asyncio.run(player_updater.update_all_players())
+            stats = await player_updater.update_all_players()
             player_updater.log_update_summary(stats)
             
-            # Log next scheduled update
-            next_run = schedule.next_run()
-            if next_run:
-                logging.info(f"⏰ Next update scheduled for: {next_run}")
-            
         except Exception as e:
             logging.error(f"Error during scheduled update: {e}")
     
@@ -137,34 +125,60 @@ class UpdaterService:
         """Run the scheduled service"""
         logging.info("🎯 ValorantSL Player Updater Service Starting")
         logging.info(f"📅 Update interval: {settings.update_interval_minutes} minutes")
-        logging.info(f"⏱️ Rate limit delay: {settings.rate_limit_delay} seconds")
+        logging.info(f"⏱️ Rate limit: {settings.requests_per_second} req/s (burst {settings.request_burst})")
         logging.info(f"🔄 Max retries: {settings.max_retries}")
         logging.info(f"🌍 Region: {settings.riot_region.upper()}")
         
-        # Schedule the update job
-        schedule.every(settings.update_interval_minutes).minutes.do(self.scheduled_update)
+        asyncio.run(self._scheduler_loop())
         
-        # Run initial update
-        logging.info("🏁 Running initial update...")
-        self.scheduled_update()
+        logging.info("🛑 ValorantSL Player Updater Service Stopped")
+    
+    async def _scheduler_loop(self):
+        """Run an update, then sleep until the next one is due or shutdown is requested"""
+        self._shutdown_event = asyncio.Event()
         
-        # Main scheduler loop
+        # Wake the sleep below, or cancel a running update, on SIGINT/SIGTERM
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._request_shutdown, sig)
+        
+        interval = timedelta(minutes=settings.update_interval_minutes)
         self.running = True
-        logging.info("✅ Scheduler started, waiting for next update...")
         
-        while self.running:
-            try:
-                schedule.run_pending()
-                time.sleep(1)  # Check every second
-                
-            except KeyboardInterrupt:
-                logging.info("Keyboard interrupt received")
-                break
-            except Exception as e:
-                logging.error(f"Error in scheduler loop: {e}")
-                time.sleep(5)  # Wait before retry
+        # Run initial update
+        logging.info("🏁 Running initial update...")
         
-        logging.info("🛑 ValorantSL Player Updater Service Stopped")
+        # Keep one Riot API session (and its warm connections) for the
+        # service's lifetime; each cycle's 'async with riot_api' reuses it
+        async with riot_api:
+            while self.running:
+                # Run the update as a task so a shutdown signal can cancel it
+                self._update_task = asyncio.create_task(self.scheduled_update())
+                try:
+                    await self._update_task
+                except asyncio.CancelledError:
+                    logging.info("Update cancelled; partial progress was saved")
+                    break
+                finally:
+                    self._update_task = None
+                
+                # The next run is one interval after the previous one finished
+                next_run = datetime.now() + interval
+                logging.info(f"⏰ Next update scheduled for: {next_run}")
+                
+                try:
+                    await asyncio.wait_for(self._shutdown_event.wait(), timeout=interval.total_seconds())
+                except asyncio.TimeoutError:
+                    continue
+    
+    def _request_shutdown(self, signum: int):
+        """Stop the scheduler loop from a signal"""
+        logging.info(f"Received signal {signum}, shutting down gracefully...")
+        self.running = False
+        if self._shutdown_event is not None:
+            self._shutdown_event.set()
+        if self._update_task is not None:
+            self._update_task.cancel()
     
     def print_service_info(self):
         """Print service information"""
@@ -176,12 +190,21 @@ class UpdaterService:
         print(f"🌐 API Base URL: {settings.riot_api_base_url}")
         print(f"🌍 Region: {settings.riot_region.upper()}")
         print(f"⏰ Update Interval: {settings.update_interval_minutes} minutes")
-        print(f"⏱️ Rate Limit: {settings.rate_limit_delay}s between players")
+        print(f"⏱️ Rate Limit: {settings.requests_per_second} req/s (burst {settings.request_burst}), {settings.max_concurrent_players} players at once")
         print(f"🔄 Max Retries: {settings.max_retries}")
         print(f"📝 Log Level: {settings.log_level}")
         print("=" * 60)
 
 
+def install_uvloop():
+    """Use uvloop's event loop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(
@@ -217,6 +240,7 @@ Examples:
     
     args = parser.parse_args()
     
+    install_uvloop()
     service = UpdaterService()
     
     if args.info:
@@ -0,0 +1,79 @@
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, model_validator
+
+
+class HenrikModel(BaseModel):
+    """Base for Henrik API payloads
+
+    Henrik sends null for fields it has no value for; those are dropped
+    before validation so the field defaults apply instead.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def _drop_nulls(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            return {key: value for key, value in data.items() if value is not None}
+        return data
+
+
+class Tier(HenrikModel):
+    """Rank tier as returned by the MMR endpoint"""
+    id: int = 0
+    name: Optional[str] = None
+
+
+class Season(HenrikModel):
+    """Season reference (id and short code such as e9a3)"""
+    id: str = ""
+    short: str = "Unknown"
+
+
+class Account(HenrikModel):
+    """Riot account embedded in the MMR response"""
+    name: str = "Unknown"
+    tag: str = "0000"
+
+
+class CurrentMmr(HenrikModel):
+    """Current rank and rating"""
+    tier: Tier = Tier()
+    rr: int = 0
+    elo: int = 0
+    last_change: int = 0
+    games_needed_for_rating: int = 0
+    rank_protection_shields: int = 0
+    leaderboard_placement: Any = None
+
+
+class PeakMmr(HenrikModel):
+    """Highest rank reached"""
+    season: Season = Season()
+    tier: Tier = Tier()
+    rr: int = 0
+
+
+class ActWin(HenrikModel):
+    """Tier of one win counted towards the act rank"""
+    name: str = "Unknown"
+
+
+class SeasonalMmr(HenrikModel):
+    """Per-season rank summary"""
+    season: Season = Season()
+    wins: int = 0
+    games: int = 0
+    end_tier: Tier = Tier()
+    end_rr: int = 0
+    ranking_schema: str = "base"
+    leaderboard_placement: Any = None
+    act_wins: List[ActWin] = []
+
+
+class MmrData(HenrikModel):
+    """The data object of the v3 MMR response, parsed once per player"""
+    account: Account = Account()
+    current: CurrentMmr = CurrentMmr()
+    peak: PeakMmr = PeakMmr()
+    seasonal: List[SeasonalMmr] = []
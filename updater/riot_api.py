@@ -1,15 +1,127 @@
 import asyncio
+import hashlib
 import logging
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+import random
+import time
+from collections import Counter
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timezone
 import httpx
+import orjson
 try:
     from .config import settings
+    from .models import MmrData
 except ImportError:
     from config import settings
+    from models import MmrData
 
 logger = logging.getLogger(__name__)
 
+# Upper bounds for full-jitter retry backoff after a failure or a 429, in seconds
+MAX_RETRY_BACKOFF = 30.0
+MAX_RATE_LIMIT_BACKOFF = 60.0
+
+# Returned instead of player data when the MMR response is the same one the
+# stored document was built from
+NOT_MODIFIED = object()
+
+# MMR bodies larger than this are decoded and validated in a worker thread,
+# so one large payload does not stall dispatching other players' requests
+PARSE_OFFLOAD_BYTES = 64 * 1024
+
+
+class TokenBucketRateLimiter:
+    """Async token bucket allowing bursts of max_tokens, refilled at rate tokens per second"""
+    
+    def __init__(self, rate: float, max_tokens: int):
+        self.rate = rate
+        self.max_tokens = max_tokens
+        self.tokens = float(max_tokens)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            blocked_for = self._blocked_until - time.monotonic()
+            if blocked_for > 0:
+                await asyncio.sleep(blocked_for)
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+    
+    def apply_quota(self, remaining: int, reset_after: float):
+        """Clamp the bucket to the quota the server reports for its current window"""
+        self._refill()
+        self.tokens = min(self.tokens, remaining)
+        if remaining < 1:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + reset_after)
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+def parse_rate_limit_headers(headers: httpx.Headers) -> Optional[Tuple[int, float]]:
+    """Read the tightest remaining quota from rate-limit response headers
+    
+    Understands Riot's X-App/X-Method-Rate-Limit(-Count) pairs, formatted as
+    "cap:window,cap:window", and the X-RateLimit-Remaining/-Reset pair sent
+    by the HenrikDev API.
+    
+    Returns:
+        (remaining requests, seconds until the window resets), or None
+    """
+    quotas: List[Tuple[int, float]] = []
+    
+    for prefix in ("X-App-Rate-Limit", "X-Method-Rate-Limit"):
+        limits = headers.get(prefix)
+        counts = headers.get(f"{prefix}-Count")
+        if not limits or not counts:
+            continue
+        try:
+            caps = dict(pair.split(":")[::-1] for pair in limits.split(","))
+            for pair in counts.split(","):
+                used, window = pair.split(":")
+                if window in caps:
+                    quotas.append((int(caps[window]) - int(used), float(window)))
+        except ValueError:
+            continue
+    
+    remaining = headers.get("X-RateLimit-Remaining")
+    if remaining is not None:
+        try:
+            quotas.append((int(remaining), float(headers.get("X-RateLimit-Reset", 0))))
+        except ValueError:
+            pass
+    
+    return min(quotas) if quotas else None
+
+
+def full_jitter(attempt: int, base: float, cap: float) -> float:
+    """Random delay in [0, min(cap, base * 2**attempt)] so concurrent retries spread out"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Seconds from a numeric Retry-After header, or None if absent or unparseable"""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
 
 class RiotAPIClient:
     """Riot Games API client for fetching player data"""
@@ -19,21 +131,50 @@ class RiotAPIClient:
         self.api_key = settings.riot_api_key
         self.region = settings.riot_region
         self.platform = settings.riot_platform
+        # Built once; each request only appends the puuid
+        self._mmr_prefix = f"/valorant/v3/by-puuid/mmr/{self.region}/{self.platform}/"
         self.session: Optional[httpx.AsyncClient] = None
+        self._session_users = 0
+        self._http_version_logged = False
+        # Outstanding requests by endpoint and validator, shared by concurrent callers
+        self._inflight: Dict[Tuple[str, Optional[str]], "asyncio.Task[Optional[httpx.Response]]"] = {}
+        
+        # Caps the outbound request rate however many players run concurrently
+        self.limiter = TokenBucketRateLimiter(settings.requests_per_second, settings.request_burst)
         
     async def __aenter__(self):
-        """Async context manager entry"""
-        await self.start_session()
+        """Async context manager entry
+        
+        Nested entries share the session opened by the outermost one, so a
+        long-running scheduler can keep one connection pool across cycles.
+        """
+        if self._session_users == 0:
+            await self.start_session()
+        self._session_users += 1
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        await self.close_session()
+        self._session_users -= 1
+        if self._session_users == 0:
+            await self.close_session()
     
     async def start_session(self):
-        """Start HTTP session"""
+        """Start HTTP session
+        
+        One HTTP/2 client is kept for the whole update run. The API is a
+        single host, so every concurrent request is multiplexed over one
+        connection instead of paying a TLS handshake per socket.
+        """
         self.session = httpx.AsyncClient(
+            base_url=self.base_url,
             headers={"Authorization": self.api_key} if self.api_key else {},
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=1,
+                max_keepalive_connections=1,
+                keepalive_expiry=60
+            ),
             timeout=30.0
         )
     
@@ -44,43 +185,86 @@ class RiotAPIClient:
             self.session = None
     
     async def _make_request(self, endpoint: str) -> Optional[Dict[str, Any]]:
-        """Make HTTP request to Riot API with retry logic"""
-        if not self.session:
-            logger.error("HTTP session not initialized")
+        """Make HTTP request to Riot API with retry logic and decode the JSON body"""
+        content = await self._fetch(endpoint)
+        if content is None:
+            return None
+        
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError as e:
+            logger.error("Invalid JSON from %s: %s", endpoint, e)
             return None
+    
+    async def _fetch(self, endpoint: str) -> Optional[bytes]:
+        """Make HTTP request to Riot API with retry logic, returning the raw body"""
+        response = await self._fetch_response(endpoint)
+        return None if response is None else response.content
+    
+    async def _fetch_response(self, endpoint: str, etag: Optional[str] = None) -> Optional[httpx.Response]:
+        """Get a 200 (or, when etag is given, 304) response for endpoint, or None
+        
+        Concurrent calls for the same endpoint share a single request; each
+        caller is shielded so one cancellation does not cancel the request
+        for the others.
+        """
+        key = (endpoint, etag)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(endpoint, etag))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+    
+    async def _request(self, endpoint: str, etag: Optional[str] = None) -> Optional[httpx.Response]:
+        """Issue one GET with rate limiting and retries"""
+        if self.session is None:
+            raise RuntimeError("HTTP session not started; use 'async with riot_api'")
         
         url = f"{self.base_url}{endpoint}"
+        headers = {"If-None-Match": etag} if etag else None
         
         for attempt in range(settings.max_retries):
             try:
-                logger.debug(f"Making request to {url} (attempt {attempt + 1})")
+                logger.debug("Making request to %s (attempt %d)", url, attempt + 1)
+                
+                async with self.limiter:
+                    response = await self.session.get(endpoint, headers=headers)
+                
+                if not self._http_version_logged:
+                    logger.debug("Riot API negotiated %s", response.http_version)
+                    self._http_version_logged = True
                 
-                response = await self.session.get(url)
+                # Slow down before the server's quota runs out, not after a 429
+                quota = parse_rate_limit_headers(response.headers)
+                if quota is not None:
+                    self.limiter.apply_quota(*quota)
                 
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 429:
-                    # Rate limited
-                    retry_after = int(response.headers.get("Retry-After", settings.retry_delay))
-                    logger.warning(f"Rate limited. Waiting {retry_after} seconds before retry")
-                    await asyncio.sleep(retry_after)
+                status = response.status_code
+                if status == 200 or status == 304:
+                    return response
+                elif status == 429:
+                    # Rate limited; pause every request on this client, not just this one
+                    retry_after = retry_after_seconds(response) or full_jitter(attempt, settings.retry_delay, MAX_RATE_LIMIT_BACKOFF)
+                    logger.warning("Rate limited. Waiting %.1f seconds before retry", retry_after)
+                    self.limiter.apply_quota(0, retry_after)
                     continue
-                elif response.status_code == 404:
-                    logger.warning(f"Player not found: {endpoint}")
+                elif status == 404:
+                    logger.warning("Player not found: %s", endpoint)
                     return None
                 else:
-                    logger.warning(f"API request failed with status {response.status_code}: {response.text}")
+                    logger.warning("API request failed with status %s: %s", status, response.text)
                     
-            except httpx.RequestError as e:
-                logger.error(f"Request error for {url}: {e}")
-            except Exception as e:
-                logger.error(f"Unexpected error for {url}: {e}")
+            except (httpx.HTTPError, ValueError) as e:
+                # Transport failures and undecodable bodies are retried;
+                # anything else is a bug and propagates to the caller
+                logger.error("Request failed for %s: %s", url, e)
             
-            # Wait before retry
+            # Exponential backoff with full jitter so concurrent retries spread out
             if attempt < settings.max_retries - 1:
-                await asyncio.sleep(settings.retry_delay)
+                await asyncio.sleep(full_jitter(attempt, settings.retry_delay, MAX_RETRY_BACKOFF))
         
-        logger.error(f"All retry attempts failed for {url}")
+        logger.error("All retry attempts failed for %s", url)
         return None
     
     async def get_player_by_puuid(self, puuid: str) -> Optional[Dict[str, Any]]:
@@ -90,9 +274,60 @@ class RiotAPIClient:
     
     async def get_player_mmr(self, puuid: str) -> Optional[Dict[str, Any]]:
         """Get player MMR/rank information"""
-        endpoint = f"/valorant/v3/by-puuid/mmr/ap/pc/{puuid}"
+        endpoint = self._mmr_prefix + puuid
         return await self._make_request(endpoint)
     
+    async def get_player_mmr_parsed(
+        self,
+        puuid: str,
+        etag: Optional[str] = None,
+        digest: Optional[str] = None
+    ) -> Any:
+        """Get player MMR as (response status, parsed data, validators)
+        
+        validators is the {"mmr_etag", "mmr_digest"} pair to store with the
+        player. When etag or digest are those of the stored document and the
+        response is unchanged (a 304, or an identical body), NOT_MODIFIED is
+        returned without parsing.
+        
+        Large bodies are parsed off the event loop; small ones inline, where
+        the thread hand-off would cost more than the parse.
+        """
+        endpoint = self._mmr_prefix + puuid
+        response = await self._fetch_response(endpoint, etag)
+        if response is None:
+            return None
+        if response.status_code == 304:
+            return NOT_MODIFIED
+        
+        content = response.content
+        body_digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        if body_digest == digest:
+            return NOT_MODIFIED
+        
+        try:
+            if len(content) > PARSE_OFFLOAD_BYTES:
+                parsed = await asyncio.to_thread(self._parse_mmr, content)
+            else:
+                parsed = self._parse_mmr(content)
+        except ValueError as e:
+            # Undecodable JSON, or a body that fails MmrData validation
+            logger.error("Invalid MMR payload from %s: %s", endpoint, e)
+            return None
+        
+        if parsed is None:
+            return None
+        validators = {"mmr_etag": response.headers.get("ETag"), "mmr_digest": body_digest}
+        return (*parsed, validators)
+    
+    @staticmethod
+    def _parse_mmr(content: bytes) -> Optional[Tuple[int, MmrData]]:
+        """Decode an MMR response body and validate its data object"""
+        payload = orjson.loads(content)
+        if not isinstance(payload, dict) or "data" not in payload:
+            return None
+        return payload.get("status", 200), MmrData.model_validate(payload["data"])
+    
     async def get_player_matches(self, puuid: str, size: int = 5) -> Optional[List[Dict[str, Any]]]:
         """Get recent matches for a player"""
         endpoint = f"/valorant/v3/by-puuid/matches/{self.region}/{puuid}?size={size}"
@@ -111,7 +346,7 @@ class RiotAPIClient:
             return response["data"]
         return None
     
-    async def get_last_played_match_date(self, puuid: str) -> Optional[str]:
+    async def get_last_played_match_date(self, puuid: str) -> Optional[datetime]:
         """Get the date of the last competitive match for a player"""
         try:
             matches = await self.get_player_matches_v4(puuid, size=1)
@@ -119,170 +354,183 @@ class RiotAPIClient:
             if matches and len(matches) > 0:
                 last_match = matches[0]
                 
-                # The v4 API includes started_at in ISO format in the metadata
+                # The v4 API includes started_at in ISO format in the metadata;
+                # store it as a native date so MongoDB compares it as a BSON Date
                 if "metadata" in last_match and "started_at" in last_match["metadata"]:
-                    last_played_date = last_match["metadata"]["started_at"]
-                    logger.debug(f"Last played match for PUUID {puuid}: {last_played_date}")
+                    last_played_date = datetime.fromisoformat(last_match["metadata"]["started_at"])
+                    logger.debug("Last played match for PUUID %s: %s", puuid, last_played_date)
                     return last_played_date
                 
                 # Fallback: try other potential timestamp fields
                 if "metadata" in last_match and "game_start" in last_match["metadata"]:
                     timestamp_ms = last_match["metadata"]["game_start"]
                     timestamp_seconds = timestamp_ms / 1000
-                    last_played_date = datetime.fromtimestamp(timestamp_seconds).isoformat()
+                    last_played_date = datetime.fromtimestamp(timestamp_seconds, tz=timezone.utc)
                     
-                    logger.debug(f"Last played match for PUUID {puuid} (from game_start): {last_played_date}")
+                    logger.debug("Last played match for PUUID %s (from game_start): %s", puuid, last_played_date)
                     return last_played_date
             
-            logger.debug(f"No recent matches found for PUUID: {puuid}")
+            logger.debug("No recent matches found for PUUID: %s", puuid)
             return None
             
-        except Exception as e:
-            logger.error(f"Error getting last played match for PUUID {puuid}: {e}")
+        except (KeyError, TypeError, ValueError) as e:
+            # Match payload without the expected metadata or timestamp format
+            logger.error("Error getting last played match for PUUID %s: %s", puuid, e)
             return None
     
-    async def get_full_player_data(self, puuid: str) -> Optional[Dict[str, Any]]:
-        """Get essential player data using only MMR endpoint (includes account info) and last played date"""
+    async def get_full_player_data(
+        self,
+        puuid: str,
+        last_updated: Optional[str] = None,
+        stored: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """Get essential player data using only MMR endpoint (includes account info) and last played date
+        
+        last_updated is the update cycle's shared ISO timestamp; the current
+        time is used when it is not given. stored is the player's current
+        document (games_played, last_played_match and the MMR validators);
+        when its game count matches the MMR response the player has not
+        played since, and the match history request is skipped.
+        
+        Returns NOT_MODIFIED when the MMR response is the one the stored
+        document was built from.
+        """
         try:
-            logger.debug(f"Fetching player data for PUUID: {puuid}")
+            logger.debug("Fetching player data for PUUID: %s", puuid)
             
-            # Get MMR data (includes account info)
-            mmr_data = await self.get_player_mmr(puuid)
-            if not mmr_data or "data" not in mmr_data:
-                logger.warning(f"No MMR data found for PUUID: {puuid}")
+            # Known players: MMR first, then match history only if they played
+            if stored and "games_played" in stored:
+                # Only documents written by the updater carry validators that
+                # match their rank data (registration writes neither)
+                etag, digest = (stored.get("mmr_etag"), stored.get("mmr_digest")) if stored.get("rank_hash") else (None, None)
+                parsed = await self.get_player_mmr_parsed(puuid, etag, digest)
+                if parsed is NOT_MODIFIED:
+                    logger.debug("MMR unchanged for PUUID: %s", puuid)
+                    return NOT_MODIFIED
+                last_played_date = None
+            else:
+                # Nothing to compare against, so fetch both concurrently
+                parsed, last_played_date = await asyncio.gather(
+                    self.get_player_mmr_parsed(puuid),
+                    self.get_last_played_match_date(puuid)
+                )
+            if not parsed:
+                logger.warning("No MMR data found for PUUID: %s", puuid)
                 return None
             
-            # Extract account info from MMR data
-            mmr_response = mmr_data["data"]
-            account_info = mmr_response.get("account", {})
+            # The MMR payload is parsed once; the helpers below read the model
+            status, mmr, validators = parsed
+            account = mmr.account
+            seasonal_ranks = self._get_seasonal_ranks_info(mmr)
+            games_played = sum(season.games for season in mmr.seasonal)
             
-            # Get last played match date
-            last_played_date = await self.get_last_played_match_date(puuid)
+            if stored and "games_played" in stored:
+                if stored["games_played"] == games_played:
+                    last_played_date = stored.get("last_played_match")
+                else:
+                    last_played_date = await self.get_last_played_match_date(puuid)
             
             # Build player data structure
             player_data = {
                 # Basic account info (from MMR endpoint)
                 "puuid": puuid,
-                "name": account_info.get("name", "Unknown"),
-                "tag": account_info.get("tag", "0000"),
+                "name": account.name,
+                "tag": account.tag,
                 
                 # Rank information
-                "rank_details": self._process_mmr_data(mmr_data),
+                "rank_details": self._process_mmr_data(mmr, status),
                 
                 # Peak rank information
-                "peak_rank": self._get_peak_rank_info(mmr_data),
+                "peak_rank": self._get_peak_rank_info(mmr),
                 
                 # Seasonal ranks information
-                "seasonal_ranks": self._get_seasonal_ranks_info(mmr_data),
+                "seasonal_ranks": seasonal_ranks,
+                "games_played": games_played,
                 
                 # Last played match date
                 "last_played_match": last_played_date,
                 
                 # Metadata
-                "last_updated": datetime.utcnow().isoformat(),
-                "update_source": "updater_service"
+                "last_updated": last_updated or datetime.utcnow().isoformat(),
+                "update_source": "updater_service",
+                **validators
             }
             
-            logger.debug(f"Successfully processed data for player: {account_info.get('name')}#{account_info.get('tag')}")
+            logger.debug("Successfully processed data for player: %s#%s", account.name, account.tag)
             return player_data
             
-        except Exception as e:
-            logger.error(f"Error processing player data for PUUID {puuid}: {e}")
+        except (KeyError, AttributeError, TypeError) as e:
+            # Payload did not have the expected shape
+            logger.error("Error processing player data for PUUID %s: %s", puuid, e)
             return None
     
-    def _process_mmr_data(self, mmr_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-        """Process MMR data into standardized format"""
-        if not mmr_data or "data" not in mmr_data:
-            return {
-                "currenttierpatched": "Unrated",
-                "current_tier": 0,
-                "elo": 0,
-                "ranking_in_tier": 0,
-                "games_needed_for_rating": 0
-            }
-        
-        data = mmr_data["data"]
-        current_data = data.get("current", {})
-        tier_info = current_data.get("tier", {})
+    def _process_mmr_data(self, mmr: MmrData, status: int = 200) -> Dict[str, Any]:
+        """Process MMR data into the nested rank_details format ({"data": ..., "status": ...})
+        used by the backend and registration flow"""
+        current = mmr.current
         
         return {
-            "currenttierpatched": tier_info.get("name", "Unrated"),
-            "current_tier": tier_info.get("id", 0),
-            "elo": current_data.get("elo", 0),
-            "ranking_in_tier": current_data.get("rr", 0),
-            "games_needed_for_rating": current_data.get("games_needed_for_rating", 0)
+            "data": {
+                "currenttier": current.tier.id,
+                "currenttierpatched": current.tier.name or "Unrated",
+                "elo": current.elo,
+                "ranking_in_tier": current.rr,
+                "mmr_change_to_last_game": current.last_change,
+                "games_needed_for_rating": current.games_needed_for_rating,
+                "rank_protection_shields": current.rank_protection_shields,
+                "leaderboard_placement": current.leaderboard_placement
+            },
+            "status": status
         }
     
-    def _get_peak_rank_info(self, mmr_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    def _get_peak_rank_info(self, mmr: MmrData) -> Dict[str, Any]:
         """Extract peak rank information"""
-        if not mmr_data or "data" not in mmr_data:
-            return {
-                "tier_name": "Unknown",
-                "season_short": "Unknown",
-                "tier": 0
-            }
-        
-        data = mmr_data["data"]
-        peak_data = data.get("peak", {})
-        tier_info = peak_data.get("tier", {})
-        season_info = peak_data.get("season", {})
+        peak = mmr.peak
         
         return {
-            "tier_name": tier_info.get("name", "Unknown"),
-            "season_short": season_info.get("short", "Unknown"),
-            "tier": tier_info.get("id", 0)
+            "tier_name": peak.tier.name or "Unknown",
+            "season_short": peak.season.short,
+            "tier": peak.tier.id,
+            "rr": peak.rr
         }
     
-    def _get_seasonal_ranks_info(self, mmr_data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _get_seasonal_ranks_info(self, mmr: MmrData) -> List[Dict[str, Any]]:
         """Extract seasonal rank information from MMR data"""
-        if not mmr_data or "data" not in mmr_data:
-            return []
-        
-        data = mmr_data["data"]
-        seasonal_data = data.get("seasonal", [])
-        
-        if not seasonal_data:
-            return []
-        
         processed_seasonal = []
         
-        for season in seasonal_data:
-            season_info = season.get("season", {})
-            end_tier_info = season.get("end_tier", {})
+        for season in mmr.seasonal:
+            end_tier_name = season.end_tier.name or "Unknown"
             
             # Process the seasonal data into our desired format
             season_record = {
-                "season_short": season_info.get("short", "Unknown"),
-                "season_id": season_info.get("id", ""),
-                "wins": season.get("wins", 0),
-                "games": season.get("games", 0),
+                "season_short": season.season.short,
+                "season_id": season.season.id,
+                "wins": season.wins,
+                "games": season.games,
                 "end_tier": {
-                    "id": end_tier_info.get("id", 0),
-                    "name": end_tier_info.get("name", "Unknown")
+                    "id": season.end_tier.id,
+                    "name": end_tier_name
                 },
-                "end_rr": season.get("end_rr", 0),
-                "ranking_schema": season.get("ranking_schema", "base"),
-                "leaderboard_placement": season.get("leaderboard_placement")
+                "end_tier_name": end_tier_name,
+                "end_rr": season.end_rr,
+                "ranking_schema": season.ranking_schema,
+                "leaderboard_placement": season.leaderboard_placement
             }
             
             # Add act wins if available (this is detailed win history)
-            act_wins = season.get("act_wins", [])
-            if act_wins:
+            if season.act_wins:
                 # Count act wins by tier to get a summary
-                tier_counts = {}
-                for act_win in act_wins:
-                    tier_name = act_win.get("name", "Unknown")
-                    tier_counts[tier_name] = tier_counts.get(tier_name, 0) + 1
+                tier_counts = Counter(act_win.name for act_win in season.act_wins)
                 
-                season_record["act_wins_summary"] = tier_counts
-                season_record["total_act_wins"] = len(act_wins)
+                season_record["act_wins_summary"] = dict(tier_counts)
+                season_record["total_act_wins"] = len(season.act_wins)
             
             processed_seasonal.append(season_record)
         
         # Sort by season (most recent first) - assuming season_short format like e10a2
-        processed_seasonal.sort(key=lambda x: x.get("season_short", ""), reverse=True)
+        processed_seasonal.sort(key=lambda x: x["season_short"], reverse=True)
         
-        logger.debug(f"Processed {len(processed_seasonal)} seasonal records")
+        logger.debug("Processed %d seasonal records", len(processed_seasonal))
         return processed_seasonal
     
     def _calculate_match_stats(self, matches_data: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
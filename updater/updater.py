@@ -1,136 +1,298 @@
 import asyncio
+import hashlib
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
+import httpx
+import orjson
+from pymongo.errors import PyMongoError
 try:
     from .config import settings
     from .database import db_manager
-    from .riot_api import riot_api
+    from .riot_api import riot_api, NOT_MODIFIED
 except ImportError:
     from config import settings
     from database import db_manager
-    from riot_api import riot_api
+    from riot_api import riot_api, NOT_MODIFIED
 
 logger = logging.getLogger(__name__)
 
+# Fetched player updates buffered before each bulk write
+UPDATE_FLUSH_SIZE = 100
+
+# Player fields covered by rank_hash; the rest change every cycle
+HASHED_FIELDS = (
+    "name",
+    "tag",
+    "rank_details",
+    "peak_rank",
+    "seasonal_ranks",
+    "games_played",
+    "last_played_match"
+)
+
+
+def _hashable(value: Any) -> Any:
+    """Normalize datetimes to how MongoDB returns them
+    
+    Fresh values are tz-aware; values reused from the stored document come
+    back naive UTC with millisecond precision. Both become aware UTC
+    truncated to milliseconds, so they hash alike.
+    """
+    if not isinstance(value, datetime):
+        return value
+    value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+def compute_rank_hash(player_data: Dict[str, Any]) -> str:
+    """Stable short hash of the player fields that only change when they play"""
+    payload = orjson.dumps(
+        [_hashable(player_data.get(field)) for field in HASHED_FIELDS],
+        option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
 
 class PlayerUpdater:
     """Main updater class that orchestrates player data updates"""
     
     def __init__(self):
-        self.stats = {
+        self.stats = self._new_stats()
+    
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        """Empty statistics for one update run"""
+        return {
             "total_players": 0,
             "updated_players": 0,
             "failed_updates": 0,
             "skipped_players": 0,
             "start_time": None,
-            "end_time": None
+            "end_time": None,
+            "duration_seconds": None
         }
     
     async def update_all_players(self) -> Dict[str, Any]:
         """Update all players in the database"""
         logger.info("Starting player data update process")
-        self.stats["start_time"] = datetime.utcnow()
+        # Statistics are per run; the updater instance lives across cycles
+        self.stats = self._new_stats()
+        
+        # One timestamp for every player written in this cycle
+        cycle_time = datetime.utcnow()
+        self.stats["start_time"] = cycle_time
+        # Wall-clock stamps mark the cycle boundaries; the duration is monotonic
+        started = time.monotonic()
         
         try:
             # Connect to database
             if not await db_manager.connect():
-                raise Exception("Failed to connect to database")
+                logger.error("Failed to connect to database")
+                return self._get_update_stats()
             
-            # Get all players
-            players = await db_manager.get_all_puuids()
-            if not players:
+            # Player count is only used for progress logging; players are
+            # streamed from the cursor as they are processed
+            expected_players = await db_manager.get_player_count()
+            if not expected_players:
                 logger.warning("No players found in database")
                 return self._get_update_stats()
             
-            self.stats["total_players"] = len(players)
-            logger.info(f"Found {len(players)} players to update")
+            logger.info("Found %d players to update", expected_players)
             
             # Start API session
             async with riot_api:
-                await self._update_players_batch(players)
+                await self._update_players_batch(db_manager.iter_players(), expected_players, cycle_time)
             
-        except Exception as e:
-            logger.error(f"Error during player update process: {e}")
+        except (httpx.HTTPError, PyMongoError) as e:
+            # Anything else propagates to the scheduler, which logs it
+            logger.error("Error during player update process: %s", e)
             
         finally:
             self.stats["end_time"] = datetime.utcnow()
+            self.stats["duration_seconds"] = time.monotonic() - started
             await db_manager.disconnect()
         
         return self._get_update_stats()
     
-    async def _update_players_batch(self, players: List[Dict[str, Any]]):
-        """Update players in batches with rate limiting"""
-        total_players = len(players)
+    async def _update_players_batch(
+        self,
+        players: AsyncIterator[Dict[str, Any]],
+        expected_players: int,
+        cycle_time: datetime
+    ):
+        """Update players concurrently under the Riot API rate limiter
         
-        for i, player in enumerate(players, 1):
+        Players are dispatched as they arrive from the cursor, at most
+        max_concurrent_players at a time; the client's token bucket caps the
+        actual request rate. Fetched data is buffered and written with one
+        bulk write per UPDATE_FLUSH_SIZE players.
+        """
+        last_updated = cycle_time.isoformat()
+        pending: List[Tuple[str, Dict[str, Any]]] = []
+        semaphore = asyncio.Semaphore(settings.max_concurrent_players)
+        tasks = set()
+        
+        async def update(i: int, player: Dict[str, Any]):
             puuid = player.get("puuid")
             name = player.get("name", "Unknown")
             tag = player.get("tag", "0000")
             
-            if not puuid:
-                logger.warning(f"Player {i}/{total_players}: Missing PUUID, skipping")
-                self.stats["skipped_players"] += 1
-                continue
-            
-            logger.info(f"Updating player {i}/{total_players}: {name}#{tag}")
-            
             try:
-                # Update single player
-                success = await self._update_single_player(puuid, name, tag)
+                if not puuid:
+                    logger.warning("Player %d/%d: Missing PUUID, skipping", i, expected_players)
+                    self.stats["skipped_players"] += 1
+                    return
+                
+                logger.info("Updating player %d/%d: %s#%s", i, expected_players, name, tag)
+                
+                try:
+                    # Fetch the player's data; the write is batched
+                    player_data = await self._fetch_player_data(puuid, name, tag, last_updated, player)
+                    
+                    if player_data is NOT_MODIFIED:
+                        # Same MMR response as last cycle: only bump the timestamps
+                        pending.append((puuid, {"last_updated": last_updated}))
+                        logger.info("✓ Fetched %s#%s (not modified)", name, tag)
+                    elif player_data and player_data["rank_hash"] == player.get("rank_hash"):
+                        # Nothing changed since last cycle: bump the timestamps and
+                        # keep the validators current for the next comparison
+                        pending.append((puuid, {
+                            "last_updated": player_data["last_updated"],
+                            "mmr_etag": player_data["mmr_etag"],
+                            "mmr_digest": player_data["mmr_digest"]
+                        }))
+                        logger.info("✓ Fetched %s#%s (unchanged)", name, tag)
+                    elif player_data:
+                        pending.append((puuid, player_data))
+                        if logger.isEnabledFor(logging.INFO):
+                            rank = player_data.get("rank_details", {}).get("data", {}).get("currenttierpatched", "Unknown")
+                            logger.info("✓ Fetched %s#%s - Rank: %s", name, tag, rank)
+                    else:
+                        self.stats["failed_updates"] += 1
+                        logger.error("✗ Failed to update %s#%s", name, tag)
                 
-                if success:
-                    self.stats["updated_players"] += 1
-                    logger.info(f"✓ Successfully updated {name}#{tag}")
-                else:
+                except Exception as e:
+                    # Top-level handler for this player's task: a bug in one
+                    # player's processing must not stop the cycle
+                    logger.error("✗ Unexpected error updating %s#%s: %s", name, tag, e, exc_info=True)
                     self.stats["failed_updates"] += 1
-                    logger.error(f"✗ Failed to update {name}#{tag}")
+            finally:
+                semaphore.release()
             
-            except Exception as e:
-                logger.error(f"✗ Exception updating {name}#{tag}: {e}")
-                self.stats["failed_updates"] += 1
+            if len(pending) >= UPDATE_FLUSH_SIZE:
+                await self._flush_updates(pending, cycle_time)
+        
+        i = 0
+        try:
+            async for player in players:
+                i += 1
+                self.stats["total_players"] += 1
+                
+                # Wait for a free slot before reading further from the cursor
+                await semaphore.acquire()
+                task = asyncio.create_task(update(i, player))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
             
-            # Rate limiting delay (except for the last player)
-            if i < total_players:
-                logger.debug(f"Waiting {settings.rate_limit_delay}s before next update")
-                await asyncio.sleep(settings.rate_limit_delay)
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            # Shutdown: stop outstanding fetches and wait for them to unwind
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        except Exception:
+            # Cursor failure: let the dispatched players finish
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            # Save whatever was fetched, including on cancellation
+            await self._flush_updates(pending, cycle_time)
+    
+    async def _flush_updates(self, pending: List[Tuple[str, Dict[str, Any]]], cycle_time: datetime):
+        """Write buffered player updates and clear the buffer"""
+        if not pending:
+            return
+        
+        # Take the batch before awaiting so concurrent fetches start a new one
+        batch = pending[:]
+        pending.clear()
+        
+        written = await db_manager.bulk_update_players(batch, updated_at=cycle_time)
+        self.stats["updated_players"] += written
+        self.stats["failed_updates"] += len(batch) - written
+        logger.info("Saved %d/%d player updates to database", written, len(batch))
+    
+    async def _fetch_player_data(
+        self,
+        puuid: str,
+        name: str,
+        tag: str,
+        last_updated: Optional[str] = None,
+        stored: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """Fetch a single player's fresh data from the Riot API
+        
+        Returns NOT_MODIFIED when the stored document is still current.
+        """
+        try:
+            player_data = await riot_api.get_full_player_data(puuid, last_updated, stored)
+            
+            if player_data is NOT_MODIFIED:
+                return player_data
+            if not player_data:
+                logger.warning("No data received for %s#%s", name, tag)
+                return None
+            
+            player_data["rank_hash"] = compute_rank_hash(player_data)
+            return player_data
+            
+        except (httpx.HTTPError, orjson.JSONEncodeError) as e:
+            # Transport errors outside the client's retries, or player data
+            # that cannot be hashed
+            logger.error("Error fetching player %s#%s: %s", name, tag, e)
+            return None
     
     async def _update_single_player(self, puuid: str, name: str, tag: str) -> bool:
         """Update a single player's data"""
         try:
             # Fetch fresh data from Riot API
-            player_data = await riot_api.get_full_player_data(puuid)
+            player_data = await self._fetch_player_data(puuid, name, tag)
             
             if not player_data:
-                logger.warning(f"No data received for {name}#{tag}")
                 return False
             
             # Update database
             success = await db_manager.update_player_data(puuid, player_data)
             
-            if success:
-                rank = player_data.get("rank_details", {}).get("currenttierpatched", "Unknown")
-                elo = player_data.get("rank_details", {}).get("elo", 0)
-                logger.debug(f"Updated {name}#{tag}: {rank} ({elo} ELO)")
+            # The rank lookup only feeds the debug line below
+            if success and logger.isEnabledFor(logging.DEBUG):
+                rank_data = player_data.get("rank_details", {}).get("data", {})
+                rank = rank_data.get("currenttierpatched", "Unknown")
+                elo = rank_data.get("elo", 0)
+                logger.debug("Updated %s#%s: %s (%s ELO)", name, tag, rank, elo)
             
             return success
             
-        except Exception as e:
-            logger.error(f"Error updating player {name}#{tag}: {e}")
+        except (httpx.HTTPError, PyMongoError) as e:
+            logger.error("Error updating player %s#%s: %s", name, tag, e)
             return False
     
     async def update_single_player_by_puuid(self, puuid: str) -> bool:
         """Update a specific player by PUUID (useful for testing)"""
-        logger.info(f"Updating single player: {puuid}")
+        logger.info("Updating single player: %s", puuid)
         
         try:
             if not await db_manager.connect():
-                raise Exception("Failed to connect to database")
+                logger.error("Failed to connect to database")
+                return False
             
             # Get player info
             player = await db_manager.get_player_by_puuid(puuid)
             if not player:
-                logger.error(f"Player not found in database: {puuid}")
+                logger.error("Player not found in database: %s", puuid)
                 return False
             
             name = player.get("name", "Unknown")
@@ -142,8 +304,8 @@ class PlayerUpdater:
             
             return success
             
-        except Exception as e:
-            logger.error(f"Error updating single player {puuid}: {e}")
+        except (httpx.HTTPError, PyMongoError) as e:
+            logger.error("Error updating single player %s: %s", puuid, e)
             return False
             
         finally:
@@ -151,12 +313,10 @@ class PlayerUpdater:
     
     def _get_update_stats(self) -> Dict[str, Any]:
         """Get update statistics"""
-        stats = self.stats.copy()
+        stats = {**self.stats}
         
-        if stats["start_time"] and stats["end_time"]:
-            duration = stats["end_time"] - stats["start_time"]
-            stats["duration_seconds"] = duration.total_seconds()
-            stats["duration_formatted"] = str(duration).split(".")[0]  # Remove microseconds
+        if stats["duration_seconds"] is not None:
+            stats["duration_formatted"] = str(timedelta(seconds=int(stats["duration_seconds"])))
         
         if stats["total_players"] > 0:
             stats["success_rate"] = (stats["updated_players"] / stats["total_players"]) * 100
@@ -170,12 +330,12 @@ class PlayerUpdater:
         logger.info("=" * 50)
         logger.info("UPDATE SUMMARY")
         logger.info("=" * 50)
-        logger.info(f"Total Players: {stats.get('total_players', 0)}")
-        logger.info(f"Successfully Updated: {stats.get('updated_players', 0)}")
-        logger.info(f"Failed Updates: {stats.get('failed_updates', 0)}")
-        logger.info(f"Skipped Players: {stats.get('skipped_players', 0)}")
-        logger.info(f"Success Rate: {stats.get('success_rate', 0):.1f}%")
-        logger.info(f"Duration: {stats.get('duration_formatted', 'Unknown')}")
+        logger.info("Total Players: %s", stats.get("total_players", 0))
+        logger.info("Successfully Updated: %s", stats.get("updated_players", 0))
+        logger.info("Failed Updates: %s", stats.get("failed_updates", 0))
+        logger.info("Skipped Players: %s", stats.get("skipped_players", 0))
+        logger.info("Success Rate: %.1f%%", stats.get("success_rate", 0))
+        logger.info("Duration: %s", stats.get("duration_formatted", "Unknown"))
         logger.info("=" * 50)
 
 